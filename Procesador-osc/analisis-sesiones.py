@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ANÁLISIS DE SESIONES (batch, multi-proceso)
+- Procesa todas las sesiones de un directorio (CSV de DataRecorder o .bses de v26)
+- Una sesión por proceso (ProcessPoolExecutor): escala con los núcleos disponibles
+- Por sesión: media/σ del env por banda, tiempo en cada estado (banda dominante),
+  movimiento ACC y BPM; se guarda <sesión>.<ext>.resumen.json
+- Índice combinado: indice_sesiones.csv (una fila por sesión)
+
+Uso:
+    python analisis-sesiones.py ../registros-meditacion
+    python analisis-sesiones.py ../registros-meditacion -o resumenes -j 16
+"""
+
+import sys
+import os
+import time
+import json
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+# --- Dependencias ---
+try:
+    import numpy as np
+    import pandas as pd
+except ImportError as e:
+    print(f"!!! ERROR: Falta librería: {e}\nInstala: pip install numpy pandas")
+    sys.exit(1)
+
+BANDS = ['delta', 'theta', 'alpha', 'beta', 'gamma']
+ACC_DEV = ['acc_x_dev', 'acc_y_dev', 'acc_z_dev']
+MOTION_THRESHOLD = 0.1  # |desviación ACC| (g) sobre la cual la fila cuenta como "en movimiento"
+
+BSES_MAGIC = b"BIOSES1\n"
+BSES_HEADER_SIZE = 65536
+
+def is_session_file(name):
+    """Sesiones de resumen (CSV o .bses); las grabaciones crudas (_raw_) no tienen bandas"""
+    return name.startswith('meditacion_') and name.endswith(('.csv', '.bses')) and '_raw_' not in name
+
+def load_session(path):
+    """Lee una sesión completa → DataFrame con las columnas numéricas (sin timestamp)"""
+    if path.endswith('.bses'):
+        with open(path, 'rb') as f:
+            if f.read(8) != BSES_MAGIC:
+                raise ValueError("no es una sesión .bses")
+            header = json.loads(f.read(int.from_bytes(f.read(4), 'little')).decode('utf-8'))
+        f8 = header.get('f8_fields', ('timestamp', 'time_sec'))
+        dtype = np.dtype([(c, '<f8' if c in f8 else '<f4') for c in header['fields']])
+        rows = max(0, (os.path.getsize(path) - BSES_HEADER_SIZE) // dtype.itemsize)
+        data = np.fromfile(path, dtype=dtype, count=rows, offset=BSES_HEADER_SIZE) if rows else np.zeros(0, dtype)
+        return pd.DataFrame({c: data[c].astype(np.float64) for c in header['fields'] if c != 'timestamp'})
+    if os.path.getsize(path) == 0:
+        return pd.DataFrame()
+    df = pd.read_csv(path, comment='#', skip_blank_lines=True)
+    return df.drop(columns=['timestamp'], errors='ignore').apply(pd.to_numeric, errors='coerce')
+
+def analyze_session(path, motion_threshold=MOTION_THRESHOLD):
+    """Estadísticas de una sesión (se ejecuta en un proceso del pool; devuelve sólo un dict chico).
+    Cualquier error queda en summary['error'] y no detiene el resto del lote."""
+    summary = {'archivo': os.path.basename(path), 'filas': 0, 'duracion_s': 0.0}
+    try:
+        return _analyze(path, motion_threshold, summary)
+    except Exception as e:
+        summary['error'] = f"{type(e).__name__}: {e}"
+        return summary
+
+def _analyze(path, motion_threshold, summary):
+    t0 = time.perf_counter()
+    df = load_session(path)
+    n = len(df)
+    summary['filas'] = n
+    if n == 0:
+        summary['error'] = 'sin filas de datos'
+        return summary
+
+    # Duración y paso por fila (las filas se graban ~1/s, pero se respeta el time_sec real)
+    if 'time_sec' in df:
+        t = df['time_sec'].to_numpy()
+        step = float(np.median(np.diff(t))) if n > 1 else 1.0
+        summary['duracion_s'] = float(t[-1] - t[0] + step)
+        # Cada fila pesa hasta la siguiente; un hueco (pausa/reconexión) no cuenta como tiempo en estado
+        dt = np.minimum(np.diff(t, append=t[-1] + step), 5 * step)
+    else:
+        dt = np.ones(n)
+        summary['duracion_s'] = float(n)
+    total = float(dt.sum())
+
+    # Bandas: media/σ del env y del rms
+    bands = [b for b in BANDS if f'{b}_env' in df]
+    summary['bandas'] = {}
+    for b in bands:
+        env = df[f'{b}_env'].to_numpy()
+        stats = {'env_media': float(np.nanmean(env)), 'env_sd': float(np.nanstd(env))}
+        if f'{b}_rms' in df:
+            stats['rms_media'] = float(np.nanmean(df[f'{b}_rms'].to_numpy()))
+        summary['bandas'][b] = stats
+
+    # Tiempo en cada estado: la banda con mayor env en cada fila (ponderado por su duración).
+    # Filas sin señal (todo NaN o todo 0, p. ej. antes del baseline) no tienen banda dominante
+    if bands:
+        env = df[[f'{b}_env' for b in bands]].to_numpy()
+        valid = ~np.isnan(env).all(axis=1) & (np.nan_to_num(env) != 0).any(axis=1)
+        dominant = np.argmax(np.nan_to_num(env, nan=-np.inf), axis=1)
+        summary['estado_s'] = {b: float(dt[valid & (dominant == k)].sum()) for k, b in enumerate(bands)}
+        summary['estado_pct'] = {b: 100.0 * s / total if total > 0 else 0.0 for b, s in summary['estado_s'].items()}
+
+    # Movimiento ACC: magnitud de la desviación respecto a la posición neutra
+    if all(c in df for c in ACC_DEV):
+        mag = np.sqrt(np.square(df[ACC_DEV].to_numpy()).sum(axis=1))
+        moving = mag > motion_threshold
+        summary['movimiento'] = {
+            'media': float(np.nanmean(mag)),
+            'p95': float(np.nanpercentile(mag, 95)),
+            'max': float(np.nanmax(mag)),
+            'tiempo_s': float(dt[moving].sum()),
+            'pct': 100.0 * float(dt[moving].sum()) / total if total > 0 else 0.0,
+        }
+
+    if 'ppg_bpm' in df:
+        bpm = df['ppg_bpm'].to_numpy()
+        bpm = bpm[bpm > 0]
+        if len(bpm):
+            summary['bpm'] = {'media': float(np.mean(bpm)), 'sd': float(np.std(bpm))}
+
+    summary['tiempo_analisis_s'] = time.perf_counter() - t0
+    return summary
+
+def index_row(summary):
+    """Aplana un resumen en una fila del índice combinado"""
+    row = {k: summary.get(k) for k in ('archivo', 'filas', 'duracion_s', 'error')}
+    for b, stats in summary.get('bandas', {}).items():
+        row[f'{b}_env_media'] = stats['env_media']
+        row[f'{b}_env_sd'] = stats['env_sd']
+    for b, pct in summary.get('estado_pct', {}).items():
+        row[f'{b}_dominante_pct'] = pct
+    for k, v in summary.get('movimiento', {}).items():
+        row[f'mov_{k}'] = v
+    if 'bpm' in summary:
+        row['bpm_media'] = summary['bpm']['media']
+    return row
+
+def main():
+    parser = argparse.ArgumentParser(description="Análisis batch de sesiones de meditación (un proceso por sesión)")
+    parser.add_argument('directorio', nargs='?', default=os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'registros-meditacion'),
+                        help="Directorio con meditacion_*.csv / .bses (default: ../registros-meditacion)")
+    parser.add_argument('-o', '--salida', default=None, help="Directorio para resúmenes e índice (default: <directorio>/analisis)")
+    parser.add_argument('-j', '--procesos', type=int, default=os.cpu_count(), help="Procesos en paralelo (default: núcleos de la CPU)")
+    parser.add_argument('--umbral-mov', type=float, default=MOTION_THRESHOLD, help=f"Umbral de movimiento ACC en g (default: {MOTION_THRESHOLD})")
+    args = parser.parse_args()
+
+    directory = os.path.abspath(args.directorio)
+    out_dir = os.path.abspath(args.salida or os.path.join(directory, 'analisis'))
+    files = [os.path.join(directory, f) for f in os.listdir(directory) if is_session_file(f)]
+    if not files:
+        print(f"❌ No hay sesiones en {directory}")
+        return 1
+    os.makedirs(out_dir, exist_ok=True)
+    # Las sesiones más grandes primero: el pool termina parejo aunque haya una sesión de horas
+    files.sort(key=os.path.getsize, reverse=True)
+    workers = max(1, min(args.procesos, len(files)))
+    print(f"📊 {len(files)} sesiones en {directory} | ⚙️  {workers} procesos")
+
+    t0 = time.perf_counter()
+    summaries = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(analyze_session, f, args.umbral_mov): f for f in files}
+        for done, future in enumerate(as_completed(futures), 1):
+            try:
+                summary = future.result()
+            except Exception as e:  # p. ej. un proceso del pool que murió
+                summary = {'archivo': os.path.basename(futures[future]), 'filas': 0, 'duracion_s': 0.0,
+                           'error': f"{type(e).__name__}: {e}"}
+            summaries.append(summary)
+            # Se conserva la extensión: meditacion_X.csv y meditacion_X.bses no comparten resumen
+            with open(os.path.join(out_dir, summary['archivo'] + '.resumen.json'), 'w', encoding='utf-8') as f:
+                json.dump(summary, f, ensure_ascii=False, indent=2)
+            status = f"❌ {summary['error']}" if 'error' in summary else f"✓ {summary['filas']} filas, {summary['duracion_s'] / 60:.1f} min"
+            print(f"[{done:3d}/{len(files)}] {summary['archivo']}: {status}")
+
+    index = pd.DataFrame([index_row(s) for s in sorted(summaries, key=lambda s: s['archivo'])])
+    index_path = os.path.join(out_dir, 'indice_sesiones.csv')
+    index.to_csv(index_path, index=False, float_format='%.6g')
+    elapsed = time.perf_counter() - t0
+    total_min = sum(s['duracion_s'] for s in summaries) / 60
+    print(f"\n✅ {len(summaries)} sesiones ({total_min:.1f} min de registro) en {elapsed:.2f}s → {index_path}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -37,6 +37,8 @@ print("Esta ventana debe permanecer abierta.\n")
 EXECUTION_MODE = 'live'  # live, csv_replay, simulation
 CSV_REPLAY_FILE = None
 CSV_REPLAY_SPEED = 1.0
+CSV_REPLAY_START = 0.0   # Segundo de sesión desde donde empezar
+CSV_REPLAY_LOOP = None   # (inicio, fin) en segundos de sesión para repetir un segmento
 
 # --- Funciones (get_local_ip, preguntar_bool) ---
 def get_local_ip():
@@ -65,30 +67,198 @@ is_simulation = False
 use_eeg = use_acc = use_myo = use_temp_hum = use_plant1 = use_plant2 = use_dist = False
 baseline_duration_seconds = 10
 
+# --- Lector de sesiones (CSV de DataRecorder o binario .bses de v26) ---
+BSES_MAGIC = b"BIOSES1\n"
+BSES_HEADER_SIZE = 65536
+TIME_INDEX_SUFFIX = '.tidx.npy'  # Índice time_sec -> byte de cada fila, cacheado junto a la sesión
+TIME_INDEX_DTYPE = np.dtype([('time_sec', '<f8'), ('offset', '<i8')])
+
+class SessionReader:
+    """Abre una sesión grabada con mmap sin parsearla entera.
+    - .bses: header JSON + registros fijos -> np.memmap (filas = tamaño del archivo)
+    - .csv:  se indexan los inicios de línea sobre el mmap (vectorizado con NumPy); sólo se
+             parsean las filas/columnas pedidas y la última fila para la duración.
+             time_index() guarda time_sec + byte de cada fila en <sesión>.tidx.npy: las aperturas
+             siguientes toman los offsets del caché sin recorrer el archivo."""
+    def __init__(self, path):
+        self.path = path
+        self.kind = 'bses' if path.endswith('.bses') else 'csv'
+        self.header = {}
+        self.fields = []
+        self.data = None      # .bses: memmap estructurado
+        self.offsets = None   # .csv: byte de inicio de cada fila de datos (+ fin de archivo)
+        self._file = None
+        self._mm = None
+        self._time_index = None
+
+    def open(self):
+        import mmap, json
+        self._file = open(self.path, 'rb')
+        if self.kind == 'bses':
+            if self._file.read(8) != BSES_MAGIC:
+                raise ValueError(f"{self.path} no es una sesión .bses")
+            self.header = json.loads(self._file.read(int.from_bytes(self._file.read(4), 'little')).decode('utf-8'))
+            self.fields = self.header['fields']
+            f8 = self.header.get('f8_fields', ('timestamp', 'time_sec'))
+            dtype = np.dtype([(f, '<f8' if f in f8 else '<f4') for f in self.fields])
+            rows = max(0, (os.path.getsize(self.path) - BSES_HEADER_SIZE) // dtype.itemsize)
+            self.data = np.memmap(self.path, dtype=dtype, mode='r', offset=BSES_HEADER_SIZE, shape=(rows,)) if rows else np.zeros(0, dtype)
+            return self
+        size = os.path.getsize(self.path)
+        if size == 0:
+            self.offsets = np.zeros(1, dtype=np.int64)
+            return self
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        cached = self._load_time_index()
+        if cached is not None:
+            self.fields = self._mm.readline().decode('utf-8', 'replace').strip().split(',')
+            self.offsets = np.append(cached['offset'], size).astype(np.int64)
+            self._time_index = cached
+            return self
+        buf = np.frombuffer(self._mm, dtype=np.uint8)
+        starts = np.concatenate(([0], np.flatnonzero(buf == 10) + 1))
+        starts = starts[starts < size]
+        self.fields = self._mm[:starts[1] if len(starts) > 1 else size].decode('utf-8', 'replace').strip().split(',')
+        first = buf[starts[1:]]
+        # filas de datos: todo lo que no es comentario (#) ni línea vacía (\n, \r\n)
+        data_starts = starts[1:][(first != ord('#')) & (first != 10) & (first != 13)]
+        self.offsets = np.append(data_starts, size).astype(np.int64)
+        del buf  # liberar la vista antes de poder cerrar el mmap
+        return self
+
+    def close(self):
+        self.data = None
+        if self._mm is not None:
+            self._mm.close(); self._mm = None
+        if self._file is not None:
+            self._file.close(); self._file = None
+
+    def __enter__(self):
+        return self.open()
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @property
+    def rows(self):
+        return len(self.data) if self.kind == 'bses' else len(self.offsets) - 1
+
+    def _csv_lines(self, start, stop):
+        return self._mm[self.offsets[start]:self.offsets[stop]]
+
+    def column(self, name, start=0, stop=None):
+        """Columna como arreglo float (NaN si vacía); sólo lee las filas [start, stop)"""
+        if name not in self.fields:
+            raise KeyError(f"Columna '{name}' no existe en {os.path.basename(self.path)}")
+        stop = self.rows if stop is None else min(stop, self.rows)
+        if start >= stop:
+            return np.zeros(0)
+        if self.kind == 'bses':
+            return np.asarray(self.data[name][start:stop], dtype=float)
+        import io
+        return pd.read_csv(io.BytesIO(self._csv_lines(start, stop)), header=None, names=self.fields,
+                           usecols=[name], comment='#')[name].to_numpy(dtype=float)
+
+    def columns(self, names=None, start=0, stop=None):
+        """DataFrame con las columnas pedidas (todas por defecto) para las filas [start, stop)"""
+        names = [n for n in (names or self.fields) if n in self.fields]
+        stop = self.rows if stop is None else min(stop, self.rows)
+        if start >= stop:
+            return pd.DataFrame(columns=names, dtype=float)
+        if self.kind == 'bses':
+            return pd.DataFrame({n: np.asarray(self.data[n][start:stop]) for n in names})
+        import io
+        return pd.read_csv(io.BytesIO(self._csv_lines(start, stop)), header=None, names=self.fields,
+                           usecols=names, comment='#')
+
+    def last_value(self, name):
+        """Valor de una columna en la última fila (lee sólo esa línea)"""
+        if self.rows == 0 or name not in self.fields:
+            return float('nan')
+        if self.kind == 'bses':
+            return float(self.data[name][-1])
+        cells = self._csv_lines(self.rows - 1, self.rows).decode('utf-8', 'replace').strip().split(',')
+        try:
+            return float(cells[self.fields.index(name)])
+        except (ValueError, IndexError):
+            return float('nan')
+
+    @property
+    def duration(self):
+        """Duración en segundos (time_sec de la última fila)"""
+        return self.last_value('time_sec')
+
+    def _load_time_index(self):
+        """Índice cacheado si existe y es más nuevo que la sesión (si no, None)"""
+        cache = self.path + TIME_INDEX_SUFFIX
+        try:
+            if os.path.getmtime(cache) < os.path.getmtime(self.path):
+                return None
+            index = np.load(cache)
+        except (OSError, ValueError):
+            return None
+        if index.dtype != TIME_INDEX_DTYPE or (len(index) and index['offset'][-1] >= os.path.getsize(self.path)):
+            return None
+        return index
+
+    def time_index(self):
+        """Arreglo (time_sec, offset) por fila. En CSV se arma una vez parseando sólo time_sec y se
+        guarda en <sesión>.tidx.npy; en .bses los registros son de tamaño fijo y no hace falta caché."""
+        if self._time_index is not None:
+            return self._time_index
+        index = np.zeros(self.rows, TIME_INDEX_DTYPE)
+        if 'time_sec' in self.fields:
+            index['time_sec'] = self.column('time_sec')
+        else:
+            index['time_sec'] = np.arange(self.rows) * 0.1  # 10Hz por defecto (como CSVReplayEngine)
+        if self.kind == 'bses':
+            index['offset'] = BSES_HEADER_SIZE + np.arange(self.rows) * self.data.dtype.itemsize
+        elif self.rows:
+            index['offset'] = self.offsets[:-1]
+            tmp = f"{self.path}{TIME_INDEX_SUFFIX}.{os.getpid()}.tmp"
+            try:
+                with open(tmp, 'wb') as f:
+                    np.save(f, index)
+                os.replace(tmp, self.path + TIME_INDEX_SUFFIX)
+            except OSError:
+                pass  # directorio de sólo lectura: el índice se rearma en memoria cada vez
+        self._time_index = index
+        return index
+
+def is_session_file(filename):
+    """Sesiones reproducibles: meditacion_*.csv / *.bses (no los crudos *_raw_*.bses)"""
+    return filename.startswith('meditacion_') and (filename.endswith('.csv') or
+                                                   (filename.endswith('.bses') and '_raw_' not in filename))
+
 def list_available_csv_files():
-    """Lista archivos CSV disponibles en el directorio del script"""
+    """Lista sesiones disponibles (CSV y .bses) en el directorio del script"""
     script_dir = os.path.dirname(os.path.abspath(__file__))
-    csv_files = [f for f in os.listdir(script_dir) if f.endswith('.csv') and f.startswith('meditacion_')]
+    csv_files = [f for f in os.listdir(script_dir) if is_session_file(f)]
     csv_files.sort(reverse=True)  # Más recientes primero
     return csv_files, script_dir
 
+def read_session_fields(path):
+    """Columnas de una sesión leyendo sólo el header (sin indexar las filas)"""
+    import json
+    with open(path, 'rb') as f:
+        if path.endswith('.bses'):
+            if f.read(8) != BSES_MAGIC:
+                raise ValueError(f"{path} no es una sesión .bses")
+            return json.loads(f.read(int.from_bytes(f.read(4), 'little')).decode('utf-8'))['fields']
+        return f.readline().decode('utf-8', 'replace').strip().split(',')
+
 def get_csv_info(csv_path):
-    """Obtiene número de líneas y duración del CSV"""
+    """Obtiene número de filas y duración de la sesión sin parsearla entera. Un CSV sin caché se
+    indexa una sola vez aquí (time_index() guarda <sesión>.tidx.npy): ese primer listado recorre
+    el archivo completo; los siguientes sólo leen el caché y la última fila."""
     try:
-        df = pd.read_csv(csv_path)
-        if 'timestamp' in df.columns:
-            df = df[~df['timestamp'].astype(str).str.startswith('#')]
-        num_lines = len(df)
-        duration_sec = 0
-        if 'time_sec' in df.columns:
-            max_time = df['time_sec'].max()
-            # Manejar NaN
-            if pd.notna(max_time):
-                duration_sec = int(max_time)
-            else:
-                duration_sec = int(num_lines / 10)
-        else:
-            duration_sec = int(num_lines / 10)
+        with SessionReader(csv_path) as reader:
+            if reader.kind == 'csv' and reader.rows:
+                reader.time_index()
+            num_lines = reader.rows
+            max_time = reader.duration
+        # Manejar NaN / sin columna time_sec
+        duration_sec = int(max_time) if not math.isnan(max_time) else int(num_lines / 10)
         return num_lines, duration_sec
     except Exception as e:
         return 0, 0
@@ -98,7 +268,7 @@ def show_main_menu():
     global is_simulation, use_eeg, use_acc, use_ppg, use_myo, use_temp_hum
     global use_plant1, use_plant2, use_dist, baseline_duration_seconds
     global in_menu, pause_outputs, save_data
-    global EXECUTION_MODE, CSV_REPLAY_FILE, CSV_REPLAY_SPEED
+    global EXECUTION_MODE, CSV_REPLAY_FILE, CSV_REPLAY_SPEED, CSV_REPLAY_START, CSV_REPLAY_LOOP
     
     in_menu = False
     pause_outputs = False
@@ -106,7 +276,7 @@ def show_main_menu():
     print("\n=== SELECCIÓN DE FUENTE DE DATOS ===")
     print("0. Modo Simulador (Datos Falsos)")
     print("1. Sensor Cerebral en Vivo (Muse)")
-    print("2. Reproducir desde CSV")
+    print("2. Reproducir sesión grabada (CSV / .bses)")
     print("3. Salir")
     choice = input("Selecciona una opción (0-3): ").strip()
 
@@ -158,7 +328,7 @@ def show_main_menu():
         csv_files, script_dir = list_available_csv_files()
         
         if not csv_files:
-            print(f"❌ No se encontraron archivos CSV (meditacion_*.csv) en: {script_dir}")
+            print(f"❌ No se encontraron sesiones (meditacion_*.csv / *.bses) en: {script_dir}")
             show_main_menu()
             return
         
@@ -168,7 +338,7 @@ def show_main_menu():
             num_lines, duration_sec = get_csv_info(csv_path)
             file_size = os.path.getsize(csv_path) / 1024
             try:
-                timestamp_part = filename.replace('meditacion_', '').replace('.csv', '')
+                timestamp_part = os.path.splitext(filename)[0].replace('meditacion_', '')
                 date_str = f"{timestamp_part[:4]}-{timestamp_part[4:6]}-{timestamp_part[6:8]}"
                 time_str = f"{timestamp_part[9:11]}:{timestamp_part[11:13]}:{timestamp_part[13:15]}"
                 duration_str = f"{duration_sec // 60}m {duration_sec % 60}s" if duration_sec >= 60 else f"{duration_sec}s"
@@ -223,6 +393,25 @@ def show_main_menu():
             print("⚠️ Valor inválido, usando velocidad 1.0")
             CSV_REPLAY_SPEED = 1.0
         
+        start_str = input("¿Comenzar desde el segundo? (Enter = inicio): ").strip()
+        try:
+            CSV_REPLAY_START = max(0.0, float(start_str)) if start_str else 0.0
+        except ValueError:
+            print("⚠️ Valor inválido, comenzando desde el inicio")
+            CSV_REPLAY_START = 0.0
+        
+        loop_str = input("¿Repetir un segmento? inicio-fin en segundos (ej. 120-180, Enter = no): ").strip()
+        CSV_REPLAY_LOOP = None
+        if loop_str:
+            try:
+                loop_start, loop_end = (float(v) for v in loop_str.split('-'))
+                if loop_end > loop_start:
+                    CSV_REPLAY_LOOP = (loop_start, loop_end)
+                else:
+                    print("⚠️ El fin debe ser mayor que el inicio, sin loop")
+            except ValueError:
+                print("⚠️ Formato inválido (usa inicio-fin), sin loop")
+        
         # Calcular duración con velocidad aplicada
         adjusted_duration = int(duration_sec / CSV_REPLAY_SPEED)
         adjusted_duration_str = f"{adjusted_duration // 60}m {adjusted_duration % 60}s" if adjusted_duration >= 60 else f"{adjusted_duration}s"
@@ -232,13 +421,17 @@ def show_main_menu():
         print(f"✓ Duración original: {duration_str}")
         print(f"✓ Duración ajustada: {adjusted_duration_str}")
         print(f"✓ Total de líneas: {num_lines}")
+        if CSV_REPLAY_START:
+            print(f"✓ Inicio: {CSV_REPLAY_START:.1f}s")
+        if CSV_REPLAY_LOOP:
+            print(f"✓ Loop: {CSV_REPLAY_LOOP[0]:.1f}s → {CSV_REPLAY_LOOP[1]:.1f}s")
         
-        # Detectar qué sensores están en el CSV
+        # Detectar qué sensores están en la sesión (sólo el header)
         try:
-            df = pd.read_csv(CSV_REPLAY_FILE, nrows=5)
-            use_eeg = 'delta_rms' in df.columns
-            use_acc = 'acc_x' in df.columns
-            use_ppg = 'ppg_bpm' in df.columns
+            columns = read_session_fields(CSV_REPLAY_FILE)
+            use_eeg = 'delta_rms' in columns
+            use_acc = 'acc_x' in columns
+            use_ppg = 'ppg_bpm' in columns
             
             print(f"\n📊 Sensores detectados en CSV:")
             print(f"   EEG: {'✓' if use_eeg else '✗'}")
@@ -270,38 +463,149 @@ def detect_serial_port():
     candidates = glob.glob("/dev/tty.usbserial*") + glob.glob("/dev/ttyUSB*") + glob.glob("/dev/ttyACM*") + glob.glob('/dev/cu.*')
     return candidates[0] if candidates else None
 
+# --- Reloj de reproducción ---
+REPLAY_MAX_LAG_SEC = 0.5  # Si el envío se atrasa más que esto (wall), se re-ancla en vez de enviar en ráfaga
+REPLAY_SPIN_SEC = 0.002   # Últimos ms antes del deadline en espera activa (time.sleep es impreciso)
+
+class ReplayClock:
+    """Programa cada fila contra un reloj monotónico absoluto: deadline = t0 + (t_fila - t_fila0) / speed.
+    El tiempo de procesamiento/envío no se acumula (no hay sleep relativo). Si una fila llega tarde
+    se envía de inmediato (catch-up); si el retraso supera max_lag se re-ancla el reloj.
+    seek() re-ancla en otro punto de la sesión; interrupt() corta la espera en curso."""
+    def __init__(self, speed_factor=1.0, max_lag=REPLAY_MAX_LAG_SEC):
+        self.speed = speed_factor
+        self.max_lag = max_lag
+        self.t0_wall = None
+        self.t0_session = None
+        self.last_session_t = None
+        self.max_late = 0.0     # máximo retraso observado en un deadline (s)
+        self.late_rows = 0      # filas enviadas después de su deadline (> 1 ms)
+        self.resyncs = 0        # veces que se re-ancló por superar max_lag
+        self.shifted = 0.0      # tiempo total descartado por re-anclajes (s)
+        self.played = 0.0       # tiempo de sesión reproducido antes del último seek (s, ya / speed)
+        self.paused_at = None
+        self.wake = threading.Event()
+
+    def start(self, session_t):
+        self.t0_wall = time.monotonic()
+        self.t0_session = session_t
+        self.last_session_t = session_t
+
+    def deadline(self, session_t):
+        return self.t0_wall + (session_t - self.t0_session) / self.speed
+
+    def wait_until(self, session_t):
+        """Espera hasta el deadline de la fila con tiempo de sesión session_t.
+        Retorna False si la espera se interrumpió (seek/pausa) y la fila no debe enviarse aún."""
+        if self.t0_wall is None:
+            self.start(session_t)
+            return True
+        if not math.isfinite(session_t):
+            return True  # fila sin tiempo: se envía sin esperar
+        target = self.deadline(session_t)
+        delay = target - time.monotonic()
+        if delay > REPLAY_SPIN_SEC and self.wake.wait(delay - REPLAY_SPIN_SEC):
+            self.wake.clear()
+            return False
+        self.last_session_t = session_t
+        while time.monotonic() < target:
+            pass
+        late = time.monotonic() - target
+        if late > 0.001:
+            self.late_rows += 1
+            self.max_late = max(self.max_late, late)
+        if late > self.max_lag:
+            self.t0_wall += late  # re-anclar: no intentar recuperar segundos de atraso en ráfaga
+            self.resyncs += 1
+            self.shifted += late
+        return True
+
+    def interrupt(self):
+        """Despierta a wait_until (desde otro hilo) para que se re-evalúe la fila siguiente"""
+        self.wake.set()
+
+    def seek(self, session_t):
+        """Re-ancla el reloj: session_t pasa a ser 'ahora' (la fila de destino sale de inmediato)"""
+        if self.t0_wall is None:
+            return
+        self.played += (self.last_session_t - self.t0_session) / self.speed
+        self.t0_wall = time.monotonic()
+        self.t0_session = self.last_session_t = session_t
+        if self.paused_at is not None:
+            self.paused_at = self.t0_wall
+
+    def pause(self):
+        if self.paused_at is None and self.t0_wall is not None:
+            self.paused_at = time.monotonic()
+
+    def resume(self):
+        if self.paused_at is not None:
+            self.t0_wall += time.monotonic() - self.paused_at  # la pausa no cuenta como drift
+            self.paused_at = None
+
+    def drift(self):
+        """Retraso actual respecto del deadline de la última fila (s, + = tarde)"""
+        if self.t0_wall is None:
+            return 0.0
+        return time.monotonic() - self.deadline(self.last_session_t)
+
+    def report(self):
+        if self.t0_wall is None:
+            return "⏱️  Reloj de reproducción sin datos"
+        expected = self.played + (self.last_session_t - self.t0_session) / self.speed
+        return (f"⏱️  Reproducción: esperado {expected:.3f}s | real {expected + self.drift() + self.shifted:.3f}s "
+                f"| drift final {self.drift()*1000:+.1f} ms | filas tarde: {self.late_rows} (máx {self.max_late*1000:.1f} ms)"
+                + (f" | re-anclajes: {self.resyncs} ({self.shifted:.2f}s)" if self.resyncs else ""))
+
 # --- Nueva clase: CSV Replay ---
+BANDS = ['delta', 'theta', 'alpha', 'beta', 'gamma']
+EEG_CHANNELS = ['tp9', 'af7', 'af8', 'tp10']  # Prefijo de las columnas por canal (modo individual de v26)
+
 class CSVReplayEngine:
-    """Motor de reproducción de datos desde CSV"""
+    """Motor de reproducción de sesiones (CSV o .bses).
+    load() extrae una sola vez las columnas a arreglos NumPy contiguos y arma una matriz por stream
+    OSC; messages() sólo convierte la fila a args al enviar: el bucle de reproducción no toca pandas.
+    seek()/set_loop() buscan en el índice de time_sec (np.searchsorted, O(log n)) sin re-parsear;
+    se pueden llamar desde otro hilo (atajos de teclado): el salto se aplica antes de la fila siguiente."""
     
     def __init__(self, csv_file, speed_factor=1.0):
         self.csv_file = csv_file
         self.speed_factor = speed_factor
-        self.df = None
+        self.columns = {}     # nombre -> np.ndarray float64
+        self.times = None     # time_sec por fila
+        self.seek_keys = None # time_sec no decreciente (clave de búsqueda del índice)
+        self.streams = []     # [(path, np.ndarray (n_filas, k) o (n_filas,)), ...]
+        self.n_rows = 0
         self.current_index = 0
         self.start_time = None
         self.paused = False
         self.last_time = 0
+        self.clock = ReplayClock(speed_factor)
+        self.loop = None          # (fila inicio, fila fin exclusiva) del segmento en loop
+        self.pending_seek = None  # fila de destino pedida desde otro hilo
+        self.lock = threading.Lock()
         
     def load(self):
-        """Carga el archivo CSV"""
+        """Carga la sesión vía SessionReader y precalcula los mensajes de cada fila"""
         try:
-            self.df = pd.read_csv(self.csv_file)
+            t_load = time.perf_counter()
+            with SessionReader(self.csv_file) as reader:
+                df = reader.columns()
+                index = reader.time_index()
+            self.n_rows = len(df)
+            self.columns = {c: pd.to_numeric(df[c], errors='coerce').to_numpy(dtype=float) for c in df.columns if c != 'timestamp'}
             
-            # Filtrar líneas de comentario si timestamp es string
-            if 'timestamp' in self.df.columns:
-                # Eliminar filas que empiezan con #
-                self.df = self.df[~self.df['timestamp'].astype(str).str.startswith('#')]
-                self.df = self.df.reset_index(drop=True)
-            
-            print(f"✓ CSV cargado: {len(self.df)} registros")
-            print(f"Columnas: {list(self.df.columns)[:10]}...")  # Mostrar primeras 10
+            print(f"✓ Sesión cargada: {self.n_rows} registros")
+            print(f"Columnas: {list(df.columns)[:10]}...")  # Mostrar primeras 10
             
             # Verificar que tenga columna time_sec
-            if 'time_sec' not in self.df.columns:
+            if 'time_sec' not in self.columns:
                 print("⚠️ No se encontró columna 'time_sec', usando índice como tiempo")
-                self.df['time_sec'] = self.df.index * 0.1  # 10Hz por defecto
-                
+            self.times = self.columns['time_sec'] = np.ascontiguousarray(index['time_sec'])
+            # Tras un hueco o reinicio time_sec puede retroceder: la búsqueda usa el máximo acumulado
+            self.seek_keys = np.maximum.accumulate(np.nan_to_num(self.times, nan=-np.inf)) if self.n_rows else self.times
+            self.streams = self._build_streams()
+            print(f"✓ {len(self.streams)} streams OSC ({self.n_rows * len(self.streams)} mensajes) listos en {(time.perf_counter() - t_load)*1000:.0f} ms")
             return True
         except Exception as e:
             print(f"✗ Error cargando CSV: {e}")
@@ -309,39 +613,119 @@ class CSVReplayEngine:
             traceback.print_exc()
             return False
     
+    def _matrix(self, names):
+        """Columnas -> matriz (n_filas, len(names)); columna ausente = 0 (como sample.get(..., 0))"""
+        zeros = np.zeros(self.n_rows)
+        return np.column_stack([self.columns.get(n, zeros) for n in names]) if self.n_rows else np.zeros((0, len(names)))
+    
+    def _build_streams(self):
+        """(path, arreglo por fila) de cada mensaje según los sensores activos y las columnas de la sesión"""
+        streams = []
+        if use_eeg:
+            env = self._matrix([f'{b}_env' for b in BANDS])
+            # signed_env real si la sesión lo trae; si no, env sin signo (simplificación de siempre)
+            signed = self._matrix([f'{b}_senv' for b in BANDS]) if f'{BANDS[0]}_senv' in self.columns else env
+            streams += [("/py/bands_env", env), ("/py/bands_signed_env", signed),
+                        ("/py/bands_raw", self._matrix([f'{b}_rms' for b in BANDS]))]
+            # Modo individual: {canal}_{banda}_{rms|env|senv} → mismas rutas por canal que en vivo
+            for ch in EEG_CHANNELS:
+                if f'{ch}_{BANDS[0]}_env' in self.columns:
+                    streams += [(f"/py/{ch}/bands_env", self._matrix([f'{ch}_{b}_env' for b in BANDS])),
+                                (f"/py/{ch}/bands_signed_env", self._matrix([f'{ch}_{b}_senv' for b in BANDS])),
+                                (f"/py/{ch}/bands_raw", self._matrix([f'{ch}_{b}_rms' for b in BANDS]))]
+        if use_acc:
+            streams.append(("/py/acc", self._matrix(['acc_x', 'acc_y', 'acc_z'])))
+        if use_ppg:
+            streams.append(("/py/ppg/bpm", self._matrix(['ppg_bpm'])[:, 0]))
+        return streams
+    
+    def messages(self, index):
+        """Mensajes (path, args) de la fila index, armados recién al enviar"""
+        return [(path, values[index].tolist()) for path, values in self.streams]
+    
     def get_next_sample(self):
-        """Obtiene la siguiente muestra con timing real"""
-        if self.current_index >= len(self.df):
-            return None
-        
-        if self.paused:
-            return None
+        """Índice de la siguiente fila, tras esperar su deadline en el ReplayClock (None al final)"""
+        while True:
+            with self.lock:
+                if self.pending_seek is not None:
+                    self._jump(self.pending_seek)
+                    self.pending_seek = None
+                if self.loop and self.current_index >= self.loop[1]:
+                    self._jump(self.loop[0])
+                if self.current_index >= self.n_rows:
+                    return None
+                index = self.current_index
             
-        row = self.df.iloc[self.current_index]
-        
-        # Calcular espera hasta siguiente muestra
-        current_time = row.get('time_sec', self.current_index * 0.1)
-        
-        if self.current_index > 0:
-            time_diff = current_time - self.last_time
-            if time_diff > 0:
-                time.sleep(time_diff / self.speed_factor)
-        
-        self.last_time = current_time
-        self.current_index += 1
-        return row
+            if self.paused:
+                time.sleep(0.05)
+                continue
+            
+            # Esperar al instante absoluto de esta muestra (sin acumular drift)
+            current_time = float(self.times[index])
+            if not self.clock.wait_until(current_time):
+                continue  # seek/pausa durante la espera
+            
+            with self.lock:
+                if self.pending_seek is not None:
+                    continue
+                self.current_index = index + 1
+            self.last_time = current_time
+            return index
+    
+    def index_at(self, session_t):
+        """Primera fila con time_sec >= session_t (búsqueda binaria en el índice)"""
+        return int(np.searchsorted(self.seek_keys, session_t, 'left'))
+    
+    def _jump(self, index):
+        self.current_index = min(max(0, index), self.n_rows)
+        if self.current_index < self.n_rows:
+            self.clock.seek(float(self.times[self.current_index]))
+    
+    def seek(self, session_t):
+        """Salta al segundo de sesión session_t (thread-safe)"""
+        with self.lock:
+            self.pending_seek = self.index_at(session_t)
+        self.clock.interrupt()
+    
+    def seek_relative(self, delta_sec):
+        """Adelanta/retrocede delta_sec segundos de sesión desde la última fila enviada"""
+        self.seek(self.last_time + delta_sec)
+    
+    def set_loop(self, start_sec, end_sec):
+        """Repite el segmento [start_sec, end_sec] de la sesión; None/None desactiva el loop"""
+        with self.lock:
+            if start_sec is None or end_sec is None or end_sec <= start_sec:
+                self.loop = None
+                return False
+            self.loop = (self.index_at(start_sec), int(np.searchsorted(self.seek_keys, end_sec, 'right')))
+            if not self.loop[0] <= self.current_index < self.loop[1]:
+                self.pending_seek = self.loop[0]
+        self.clock.interrupt()
+        return True
+    
+    def toggle_pause(self):
+        self.paused = not self.paused
+        if self.paused:
+            self.clock.pause()
+        else:
+            self.clock.resume()
+        self.clock.interrupt()
+        return self.paused
     
     def reset(self):
         """Reinicia la reproducción"""
-        self.current_index = 0
+        with self.lock:
+            self.current_index = 0
+            self.pending_seek = None
         self.start_time = time.time()
         self.last_time = 0
+        self.clock = ReplayClock(self.speed_factor)
     
     def get_progress(self):
         """Retorna progreso 0-100"""
-        if self.df is None or len(self.df) == 0:
+        if self.n_rows == 0:
             return 0
-        return int((self.current_index / len(self.df)) * 100)
+        return int((self.current_index / self.n_rows) * 100)
 
 # --- Config Inicial Red ---
 OSC_PORT = 5001
@@ -465,77 +849,37 @@ def csv_replay_loop():
     # Marcar baseline como completo (datos ya están procesados)
     baseline_done = True
     
-    print("\n▶️  Reproducción iniciada (Ctrl+C para detener)\n")
+    if CSV_REPLAY_START:
+        replay_engine.seek(CSV_REPLAY_START)
+    if CSV_REPLAY_LOOP:
+        replay_engine.set_loop(*CSV_REPLAY_LOOP)
+    threading.Thread(target=listen_replay_shortcuts, args=(replay_engine,), daemon=True).start()
+    
+    print("\n▶️  Reproducción iniciada (Ctrl+C para detener)")
+    print("   Atajos: ,/. ±10s | </> ±60s | 0 inicio | espacio pausa | [ ] marcar loop | \\ quitar loop\n")
     print("Progreso: [                    ] 0%")
     
-    last_progress_print = 0
+    last_progress_print = -5
     
     try:
         while threads_active:
-            sample = replay_engine.get_next_sample()
+            index = replay_engine.get_next_sample()
             
-            if sample is None:
+            if index is None:
                 print("\n✓ Reproducción completada")
+                print(replay_engine.clock.report())
                 break
             
-            # Extraer y enviar datos EEG
-            if use_eeg:
-                try:
-                    bands_env = [
-                        float(sample.get('delta_env', 0)),
-                        float(sample.get('theta_env', 0)),
-                        float(sample.get('alpha_env', 0)),
-                        float(sample.get('beta_env', 0)),
-                        float(sample.get('gamma_env', 0))
-                    ]
-                    
-                    # Para signed_env, usar env con signo (simplificación)
-                    bands_signed = bands_env
-                    
-                    send_proc("/py/bands_env", bands_env)
-                    send_proc("/py/bands_signed_env", bands_signed)
-                    
-                    # Enviar raw también
-                    bands_raw = [
-                        float(sample.get('delta_rms', 0)),
-                        float(sample.get('theta_rms', 0)),
-                        float(sample.get('alpha_rms', 0)),
-                        float(sample.get('beta_rms', 0)),
-                        float(sample.get('gamma_rms', 0))
-                    ]
-                    send_proc("/py/bands_raw", bands_raw)
-                except Exception as e:
-                    if debug_mode:
-                        print(f"Error enviando EEG: {e}")
-            
-            # Extraer y enviar ACC
-            if use_acc:
-                try:
-                    acc_data = [
-                        float(sample.get('acc_x', 0)),
-                        float(sample.get('acc_y', 0)),
-                        float(sample.get('acc_z', 0))
-                    ]
-                    send_proc("/py/acc", acc_data)
-                except Exception as e:
-                    if debug_mode:
-                        print(f"Error enviando ACC: {e}")
-            
-            # Extraer y enviar PPG
-            if use_ppg:
-                try:
-                    ppg_bpm = float(sample.get('ppg_bpm', 0))
-                    send_proc("/py/ppg/bpm", ppg_bpm)
-                except Exception as e:
-                    if debug_mode:
-                        print(f"Error enviando PPG: {e}")
+            # Enviar los mensajes de esta fila
+            for path, data in replay_engine.messages(index):
+                send_proc(path, data)
             
             # Mostrar progreso
             progress = replay_engine.get_progress()
-            time_sec = float(sample.get('time_sec', 0))
+            time_sec = replay_engine.last_time
             
-            # Actualizar cada 5%
-            if progress >= last_progress_print + 5:
+            # Actualizar cada 5% (también hacia atrás tras un seek)
+            if progress // 5 != last_progress_print // 5:
                 progress_bar = "█" * (progress // 5) + " " * (20 - progress // 5)
                 sys.stdout.write(f"\rProgreso: [{progress_bar}] {progress}% | ⏱️  {time_sec:.1f}s")
                 sys.stdout.flush()
@@ -543,11 +887,62 @@ def csv_replay_loop():
     
     except KeyboardInterrupt:
         print("\n\n⏸️  Reproducción detenida por el usuario")
+        print(replay_engine.clock.report())
     except Exception as e:
         print(f"\n❌ Error durante reproducción: {e}")
         import traceback
         traceback.print_exc()
 
+def listen_replay_shortcuts(engine):
+    """Atajos durante la reproducción: scrub con , . < >, 0 inicio, espacio pausa, [ ] loop, \\ quitar loop.
+    Thread daemon no-blocking (mismo esquema que listen_shortcuts de v24)."""
+    try:
+        import termios, tty, fcntl
+        fd = sys.stdin.fileno()
+        old_settings = termios.tcgetattr(fd)
+        tty.setcbreak(fd)
+        
+        # Poner stdin en non-blocking
+        flags = fcntl.fcntl(fd, fcntl.F_GETFL)
+        fcntl.fcntl(fd, fcntl.F_SETFL, flags | os.O_NONBLOCK)
+        
+        loop_mark = None
+        steps = {',': -10, '.': 10, '<': -60, '>': 60}
+        while threads_active:
+            try:
+                ch = sys.stdin.read(1)
+                if ch in steps:
+                    engine.seek_relative(steps[ch])
+                    print(f"\n⏩ {engine.last_time:.1f}s {steps[ch]:+d}s")
+                elif ch == '0':
+                    engine.seek(-math.inf)
+                    print("\n⏮️  Inicio de la sesión")
+                elif ch == ' ':
+                    print("\n⏸️  Pausa" if engine.toggle_pause() else "\n▶️  Continuando")
+                elif ch == '[':
+                    loop_mark = engine.last_time
+                    print(f"\n🔁 Inicio de loop marcado en {loop_mark:.1f}s (] para cerrar)")
+                elif ch == ']' and loop_mark is not None:
+                    if engine.set_loop(loop_mark, engine.last_time):
+                        print(f"\n🔁 Loop {loop_mark:.1f}s → {engine.last_time:.1f}s")
+                elif ch == '\\':
+                    engine.set_loop(None, None); loop_mark = None
+                    print("\n➡️  Loop desactivado")
+                elif ch == '\x11':  # Ctrl+Q
+                    print("\n👋 Ctrl+Q detectado: saliendo...")
+                    return_to_menu(exit_app=True)
+            except (IOError, OSError):
+                # No data available, expected in non-blocking mode
+                pass
+            time.sleep(0.05)
+    except Exception:
+        return
+    finally:
+        try:
+            termios.tcsetattr(sys.stdin.fileno(), termios.TCSADRAIN, old_settings)
+        except Exception:
+            pass
+
 def simulation_loop():
     """Bucle de simulación (mismo que v24)"""
     global baseline_done
@@ -11,8 +11,9 @@ SCRIPT PYTHON (v26-multichannel)
 import sys
 import time # Para la pausa inicial
 
-import math, re, threading, logging, socket
+import math, re, threading, logging, socket, select, asyncio, contextlib, queue, bisect, os, json
 from collections import deque
+from datetime import datetime
 from pythonosc.udp_client import SimpleUDPClient
 
 # --- Dependencias ---
@@ -20,6 +21,8 @@ try:
     import numpy as np; import scipy.signal as sg
     from pythonosc.dispatcher import Dispatcher
     from pythonosc.osc_server import BlockingOSCUDPServer
+    from pythonosc.osc_bundle_builder import OscBundleBuilder, IMMEDIATELY
+    from pythonosc.osc_message_builder import OscMessageBuilder
 except ImportError as e: print(f"!!! ERROR: Falta librería: {e}\nInstala dependencias"); input("Enter..."); sys.exit(1)
 # --------------------
 
@@ -62,9 +65,108 @@ is_simulation = False
 use_eeg = use_acc = use_myo = use_temp_hum = use_plant1 = use_plant2 = use_dist = False
 baseline_duration_seconds = 10
 
+def preguntar_config_eeg():
+    """Modo de canales, motor de bandas y ventana/hop (vivo y re-procesamiento batch)"""
+    global eeg_processing_mode, band_engine_mode, window_seconds, hop_ms, adaptive_baseline, adaptive_tau_sec, robust_bands
+    eeg_processing_mode = 'individual' if preguntar_bool("¿Procesar canales individuales?") else 'average'
+    print(f"✓ Modo EEG: {eeg_processing_mode.upper()}")
+    engine_str = input("🎛️  Motor de bandas: 1=IIR (filtros), 2=FFT, 3=Welch (default=1): ").strip()
+    band_engine_mode = {'2': 'fft', '3': 'welch'}.get(engine_str, 'iir')
+    print(f"✓ Motor de bandas: {band_engine_mode.upper()}")
+    while True:
+        try:
+            win_str = input("🪟 ¿Ventana de análisis en segundos? (ej. 1, default=2): ").strip()
+            window_seconds = float(win_str) if win_str else 2.0
+            hop_str = input("⏩ ¿Salto entre actualizaciones (hop) en ms? (ej. 125, default=1000): ").strip()
+            hop_ms = float(hop_str) if hop_str else 1000.0
+            if window_seconds < 0.25 or window_seconds > 8: print("⚠️ Ventana entre 0.25 y 8 s"); continue
+            if hop_ms <= 0 or hop_ms > window_seconds * 1000: print("⚠️ Hop debe ser > 0 y <= ventana"); continue
+            print(f"✓ Ventana: {window_seconds:g}s | Hop: {hop_ms:g}ms ({1000.0 / hop_ms:.1f} actualizaciones/s)")
+            break
+        except ValueError: print("⚠️ Ingresa un número válido")
+    adaptive_baseline = preguntar_bool("¿Baseline adaptativo? (sigue la deriva lenta sin recalibrar)")
+    while adaptive_baseline:
+        try:
+            tau_str = input("⏳ ¿Constante de tiempo del baseline adaptativo en segundos? (default=120): ").strip()
+            adaptive_tau_sec = float(tau_str) if tau_str else 120.0
+            if adaptive_tau_sec < 10: print("⚠️ Mínimo 10s (más corto seguiría la propia meditación)"); continue
+            print(f"✓ Baseline adaptativo: τ={adaptive_tau_sec:g}s")
+            break
+        except ValueError: print("⚠️ Ingresa un número válido")
+    all_bands = ('delta', 'theta', 'alpha', 'beta', 'gamma')
+    while True:
+        robust_str = input("🛡️  ¿Bandas con baseline robusto (mediana/IQR, ignora parpadeos)? ej. delta,gamma | todas | Enter = ninguna: ").strip().lower()
+        robust_bands = set(all_bands) if robust_str == 'todas' else {b.strip() for b in robust_str.split(',') if b.strip()}
+        if robust_bands <= set(all_bands): break
+        print(f"⚠️ Bandas válidas: {', '.join(all_bands)}")
+    if robust_bands:
+        print(f"✓ Baseline robusto: {', '.join(b for b in all_bands if b in robust_bands)}")
+
+def preguntar_formato_grabacion():
+    global record_format
+    fmt_str = input("💾 Formato de grabación: 1=CSV, 2=Binario .bses (compacto, carga rápida) (default=1): ").strip()
+    record_format = 'bses' if fmt_str == '2' else 'csv'
+    print(f"✓ Formato: {record_format.upper()}")
+
+PROFILE_DIR_NAME = 'perfiles-baseline'  # Junto al script: <nombre>.json por participante
+
+def profile_path(name):
+    slug = re.sub(r'[^\w-]+', '_', name.strip().lower()).strip('_') or 'sin_nombre'
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), PROFILE_DIR_NAME, slug + '.json')
+
+def load_baseline_profile(name):
+    """Perfil guardado del participante (None si no existe o está dañado)"""
+    try:
+        with open(profile_path(name), encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        print(f"⚠️ Perfil de {name} ilegible ({e}), se calibrará de nuevo")
+        return None
+
+def preguntar_perfil_baseline():
+    """Participante + perfil guardado: usarlo evita los ~25 s de calibración EEG/ACC"""
+    global participant, baseline_profile, profile_refine_sec
+    participant = input("👤 ¿Nombre del participante? (perfil de baseline, Enter = sin perfil): ").strip() or None
+    baseline_profile = None
+    profile_refine_sec = 0
+    if not participant:
+        return
+    profile = load_baseline_profile(participant)
+    if profile is None:
+        print(f"✓ Sin perfil previo: el baseline de esta sesión se guardará para {participant}")
+        return
+    cfg = profile.get('config', {})
+    print(f"📂 Perfil de {participant} del {profile.get('saved', '?')} "
+          f"(modo {cfg.get('eeg_mode', '?')}, motor {cfg.get('band_engine', '?')}, ventana {cfg.get('win', '?')}/{cfg.get('step', '?')} muestras)")
+    if not preguntar_bool("¿Usar el perfil guardado (sin calibrar)?"):
+        return
+    baseline_profile = profile
+    if use_eeg:
+        while True:
+            try:
+                refine_str = input("🔧 ¿Refinamiento EEG corto en segundos? (0 = arrancar ya, default=0): ").strip()
+                profile_refine_sec = int(refine_str) if refine_str else 0
+                if 0 <= profile_refine_sec <= 60: break
+                print("⚠️ Entre 0 y 60s")
+            except ValueError: print("⚠️ Ingresa un número válido")
+
+def list_raw_sessions():
+    """Grabaciones crudas (*_raw_eeg.bses) en el directorio actual y en el del script"""
+    import os
+    dirs = [os.getcwd(), os.path.dirname(os.path.abspath(__file__))]
+    found = {}
+    for d in dirs:
+        for f in os.listdir(d):
+            if f.startswith('meditacion_') and f.endswith('_raw_eeg.bses'):
+                found.setdefault(f, os.path.join(d, f))
+    return [found[f] for f in sorted(found, reverse=True)]  # Más recientes primero
+
 def show_main_menu():
     """Muestra el menú principal y procesa la selección del usuario."""
-    global is_simulation, use_eeg, use_acc, use_ppg, use_myo, use_temp_hum, use_plant1, use_plant2, use_dist, baseline_duration_seconds, in_menu, pause_outputs, save_data
+    global is_simulation, use_eeg, use_acc, use_ppg, use_myo, use_temp_hum, use_plant1, use_plant2, use_dist, baseline_duration_seconds, in_menu, pause_outputs, save_data, save_raw
+    global is_batch, batch_raw_eeg
     
     in_menu = False  # Salir del menú cuando se selecciona una opción
     pause_outputs = False  # Reanudar outputs
@@ -72,12 +174,16 @@ def show_main_menu():
     print("\n=== SELECCIÓN DE FUENTE DE DATOS ===")
     print("0. Modo Simulador (Datos Falsos)")
     print("1. Solo Sensor Cerebral (Muse)")
-    print("2. Salir")
-    choice = input("Selecciona una opción (0-2): ").strip()
+    print("2. Re-procesar sesión cruda (batch, sin tiempo real)")
+    print("3. Salir")
+    choice = input("Selecciona una opción (0-3): ").strip()
 
     is_simulation = (choice == '0')
+    is_batch = False
+    global participant, baseline_profile
+    participant = baseline_profile = None
     use_eeg = use_acc = use_ppg = use_myo = use_temp_hum = use_plant1 = use_plant2 = use_dist = False
-    save_data = False
+    save_data = save_raw = False
     baseline_duration_seconds = 10  # Default
 
     if is_simulation:
@@ -90,14 +196,18 @@ def show_main_menu():
         print("--- Config Sensor Cerebral ---")
         use_eeg = preguntar_bool("¿Ondas?")
         if use_eeg:
-            global eeg_processing_mode
-            eeg_processing_mode = 'individual' if preguntar_bool("¿Procesar canales individuales?") else 'average'
-            print(f"✓ Modo EEG: {eeg_processing_mode.upper()}")
+            preguntar_config_eeg()
         use_acc = preguntar_bool("¿Accel?")
         use_ppg = preguntar_bool("¿Heartbeat/PPG?")
+        preguntar_perfil_baseline()
         save_data = preguntar_bool("¿Guardar datos?")
+        if save_data:
+            preguntar_formato_grabacion()
+            save_raw = preguntar_bool("¿Grabar también señal cruda (EEG 256 Hz + ACC/PPG) para re-procesar?")
+        global use_asyncio_server
+        use_asyncio_server = preguntar_bool("¿Servidor asyncio (recepción, grabación y envío en tareas separadas)?")
         use_myo = use_temp_hum = use_plant1 = use_plant2 = use_dist = False
-        if use_eeg:
+        if use_eeg and baseline_profile is None:
             while True:
                 try:
                     baseline_str = input("⏱️  ¿Duración del baseline en segundos? (recomendado 10-30s, default=10): ").strip()
@@ -108,6 +218,34 @@ def show_main_menu():
                     break
                 except ValueError: print("⚠️ Ingresa un número válido")
     elif choice == '2':
+        import os
+        print("\n--- RE-PROCESAMIENTO BATCH ---")
+        raw_files = list_raw_sessions()
+        if not raw_files:
+            print("❌ No se encontraron grabaciones crudas (meditacion_*_raw_eeg.bses). Graba con '¿Grabar también señal cruda?'")
+            show_main_menu(); return
+        print("\n📊 Grabaciones crudas disponibles:\n")
+        for idx, path in enumerate(raw_files, 1):
+            print(f"{idx}. {os.path.basename(path)} | 📁 {os.path.getsize(path) / 1e6:.1f}MB")
+        try:
+            batch_raw_eeg = raw_files[int(input(f"\nSelecciona archivo (1-{len(raw_files)}): ").strip()) - 1]
+        except (ValueError, IndexError):
+            print("❌ Opción inválida"); show_main_menu(); return
+        prefix = batch_raw_eeg[:-len('_raw_eeg.bses')]
+        is_batch = True; use_eeg = True; save_data = True
+        use_acc = os.path.exists(prefix + '_raw_acc.bses')
+        use_ppg = os.path.exists(prefix + '_raw_ppg.bses')
+        print(f"✓ Streams: EEG ✓ | ACC {'✓' if use_acc else '✗'} | PPG {'✓' if use_ppg else '✗'}")
+        preguntar_config_eeg()
+        preguntar_formato_grabacion()
+        while True:
+            try:
+                baseline_str = input("⏱️  ¿Duración del baseline en segundos? (default=10): ").strip()
+                baseline_duration_seconds = int(baseline_str) if baseline_str else 10
+                if 0 < baseline_duration_seconds <= 120: break
+                print("⚠️ Entre 1 y 120s")
+            except ValueError: print("⚠️ Ingresa un número válido")
+    elif choice == '3':
         print("Saliendo."); return_to_menu(exit_app=True)
     else:
         print("Opción inválida."); show_main_menu()
@@ -137,8 +275,22 @@ OSC_PORT = 5001; MY_LOCAL_IP = get_local_ip()
 is_simulation = False
 use_eeg = use_acc = use_ppg = use_gyro = use_jaw = use_myo = use_temp_hum = use_plant1 = use_plant2 = use_dist = False
 save_data = False
+is_batch = False  # Re-procesamiento offline de una grabación cruda (ver batch_reprocess)
+batch_raw_eeg = None  # Ruta del *_raw_eeg.bses a re-procesar
+save_raw = False  # RawSampleRecorder: cada muestra EEG/ACC/PPG a .bses (además del resumen 1 Hz)
+record_format = 'csv'  # 'csv' (texto, compatible con v25) o 'bses' (binario, ver BinaryDataRecorder)
+use_asyncio_server = False  # Bucle en vivo con asyncio (tareas + colas) en vez de handle_request()
 baseline_duration_seconds = 10
 eeg_processing_mode = 'average'  # 'average' o 'individual'
+band_engine_mode = 'iir'  # 'iir' (filtros pasa-banda), 'fft' o 'welch' (espectral)
+window_seconds = 2.0  # Ventana de análisis EEG
+hop_ms = 1000.0       # Salto entre ventanas (1 actualización de /py/bands_env por hop)
+adaptive_baseline = False  # mu/sd por banda siguen la deriva lenta tras el baseline (ver adapt_baseline)
+adaptive_tau_sec = 120.0   # Constante de tiempo del baseline adaptativo
+robust_bands = set()       # Bandas cuyo baseline usa mediana/IQR (RobustStats) en vez de media/σ
+participant = None         # Nombre del participante: clave del perfil de baseline
+baseline_profile = None    # Perfil cargado (dict) si se eligió usarlo en vez de calibrar
+profile_refine_sec = 0     # Segundos de refinamiento EEG sobre el perfil (0 = arranque inmediato)
 
 # Mostrar el menú inicial
 show_main_menu()
@@ -169,20 +321,85 @@ except Exception as e: print(f"!!! ERROR FATAL creando cliente OSC: {e}"); input
 
 # --- Wrapper para enviar OSC que respeta el modo recalibración/pause ---
 in_recalibration = False
+recal_eeg_frames = 0    # Hops que faltan del baseline EEG sombra (0 = sin recalibración EEG en curso)
+recal_acc_phase = None  # Fase del baseline ACC sombra: 'neutral', 'movement' o None
+recal_acc_t0 = None     # Inicio (clock_time) de la fase ACC sombra actual
+recal_acc_last = None   # Última muestra (clock_time) de la fase ACC sombra actual
 pause_outputs = False
 debug_mode = False  # Se activa con Ctrl+D
 show_realtime_data = True  # Se alterna con Ctrl+R para mostrar/ocultar datos en tiempo real
 in_menu = False  # Flag para indicar que estamos en el menú principal
+async_pipeline = None  # AsyncOSCPipeline activo: send_proc encola en vez de enviar directo
 exit_requested = False  # Flag para solicitar salida de la aplicación
+virtual_now = None  # Re-procesamiento batch: timestamp de la muestra en curso (None = reloj real)
+
+def clock_time():
+    """time.time() en vivo; en re-procesamiento batch, el tiempo virtual de la grabación"""
+    return time.time() if virtual_now is None else virtual_now
+
+# --- Salida agrupada en bundles OSC ---
+# Dentro de un `with osc_bundle_tick():` los send_proc del hilo actual se acumulan y
+# se envían al final como UN bundle OSC: un datagrama por hop EEG (process_eeg_block
+# abre un tick por hop, que cubre los anillos multicanal y promedio) y frames atómicos para TouchDesigner. El timetag es IMMEDIATELY: un
+# timetag absoluto haría que los receptores que lo respetan esperen a ese instante
+# según su propio reloj (desfase entre máquinas = frames demorados o desordenados).
+USE_OSC_BUNDLES = True
+OSC_BUNDLE_MAX_MESSAGES = 128  # Bundles más grandes se parten (límite de datagrama UDP)
+_bundle_state = threading.local()
+
+@contextlib.contextmanager
+def osc_bundle_tick():
+    """Agrupa los mensajes enviados por este hilo durante el bloque en un bundle OSC"""
+    if not USE_OSC_BUNDLES or getattr(_bundle_state, 'messages', None) is not None:
+        yield  # Desactivado o tick anidado: lo envía el tick exterior
+        return
+    _bundle_state.messages = []
+    try:
+        yield
+    finally:
+        messages, _bundle_state.messages = _bundle_state.messages, None
+        if messages:
+            send_bundle(messages)
+
+def build_bundle(messages):
+    """Construye un bundle OSC (entrega inmediata) a partir de [(path, data), ...]"""
+    bundle = OscBundleBuilder(IMMEDIATELY)
+    for path, data in messages:
+        msg = OscMessageBuilder(address=path)
+        for value in (data if isinstance(data, (list, tuple)) else [data]):
+            msg.add_arg(value)
+        bundle.add_content(msg.build())
+    return bundle.build()
+
+def send_bundle(messages):
+    """Envía los mensajes acumulados como bundle(s) OSC"""
+    try:
+        for i in range(0, len(messages), OSC_BUNDLE_MAX_MESSAGES):
+            packet = build_bundle(messages[i:i + OSC_BUNDLE_MAX_MESSAGES])
+            if async_pipeline is not None:
+                async_pipeline.put_outbound(None, packet)
+            elif proc_client is not None:
+                proc_client.send(packet)
+    except BlockingIOError:
+        pass
+    except Exception as e:
+        if debug_mode:
+            print(f"Error enviando bundle OSC: {e}")
 
 def send_proc(path, data, force=False):
     """Enviar OSC a Processing salvo si estamos en recalibración/pause.
-    force=True envía aunque pause esté activo (usar sólo desde el thread de recalibración)."""
+    force=True envía aunque pause esté activo (usar sólo desde el thread de recalibración).
+    Dentro de osc_bundle_tick() el mensaje se acumula para el bundle del tick."""
     global pause_outputs, proc_client
     try:
         if pause_outputs and not force:
             return
-        if proc_client is not None:
+        pending = getattr(_bundle_state, 'messages', None)
+        if pending is not None:
+            pending.append((path, data))
+        elif async_pipeline is not None:
+            async_pipeline.put_outbound(path, data)
+        elif proc_client is not None:
             proc_client.send_message(path, data)
     except BlockingIOError:
         # Socket no-bloqueante saturado, ignorar silenciosamente
@@ -210,10 +427,100 @@ def send_baseline_event(phase, event_type, duration=0):
         if debug_mode:
             print(f"Error enviando evento baseline: {e}")
 
+# --- Scheduler de salida para sensores por muestra (ACC/gyro/PPG) ---
+# Los handlers de sensores llegan a 50-64 Hz cada uno; el visualizador sólo necesita
+# el último valor por dirección a su frame rate. El scheduler guarda el último valor
+# por path y los envía juntos (un bundle) a OUTPUT_RATE_HZ. Debe quedar claramente bajo
+# la tasa de los sensores para que haya algo que agrupar: a 60 Hz (≈ ACC/gyro) casi cada
+# muestra salía sola. 30 Hz = frame rate típico de la visual en TD; subirlo si TD corre a
+# 60 fps y se nota el salto.
+OUTPUT_RATE_HZ = 30.0  # 0 = enviar cada muestra directamente (sin scheduler)
+
+class OutputScheduler:
+    """Coalesce mensajes OSC por dirección y los envía a tasa fija desde su propio hilo"""
+    def __init__(self, rate_hz=OUTPUT_RATE_HZ):
+        self.period = 1.0 / max(1.0, rate_hz)
+        self.latest = {}  # path -> data (último valor pendiente)
+        self.lock = threading.Lock()
+        self.submitted = 0  # mensajes recibidos de los handlers
+        self.coalesced = 0  # reemplazados por un valor más nuevo antes de enviarse
+        self.dropped = 0    # descartados por pause_outputs (recalibración)
+        self.sent = 0
+        self.flushes = 0
+        self.running = False
+        self.thread = None
+
+    def submit(self, path, data):
+        with self.lock:
+            self.submitted += 1
+            if path in self.latest:
+                self.coalesced += 1
+            self.latest[path] = data
+
+    def flush(self):
+        with self.lock:
+            if not self.latest:
+                return
+            pending, self.latest = self.latest, {}
+        if pause_outputs:
+            self.dropped += len(pending)
+            return
+        with osc_bundle_tick():
+            for path, data in pending.items():
+                send_proc(path, data)
+        self.sent += len(pending)
+        self.flushes += 1
+
+    def _loop(self):
+        next_t = time.monotonic()
+        while self.running:
+            next_t += self.period
+            delay = next_t - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                next_t = time.monotonic()  # atrasado: no acumular ráfagas
+            self.flush()
+
+    def start(self):
+        self.running = True
+        self.thread = threading.Thread(target=self._loop, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.running = False
+        if self.thread is not None:
+            self.thread.join(timeout=0.5)
+        self.flush()
+
+    def stats_line(self):
+        return (f"[OUT] {self.submitted} mensajes de sensores → {self.sent} enviados en {self.flushes} frames "
+                f"({1.0/self.period:.0f} Hz) | coalescidos: {self.coalesced} | descartados (pausa): {self.dropped}")
+
+output_scheduler = None  # Se crea al lanzar los loops si hay Muse real
+
+def send_sensor(path, data):
+    """Envía un valor de sensor por muestra: vía scheduler si está activo, si no directo"""
+    if output_scheduler is not None:
+        output_scheduler.submit(path, data)
+    else:
+        send_proc(path, data)
+
+
+# --- Escritura en segundo plano del DataRecorder ---
+RECORDER_QUEUE_SIZE = 1024     # Filas/marcadores pendientes antes de descartar
+RECORDER_FLUSH_ROWS = 30       # Flush a disco cada N filas...
+RECORDER_FLUSH_SEC = 5.0       # ...o cada N segundos, lo que ocurra primero
+
+# Columnas por canal en la sesión: (sufijo de columna, clave en bands_per_channel)
+CHANNEL_COLUMNS = (('rms', 'rms'), ('env', 'env'), ('senv', 'signed_env'), ('cc', 'cc'))
 
 class DataRecorder:
-    """Registra datos de sensores a CSV cada 1 segundo post-baseline"""
-    def __init__(self, filename=None):
+    """Registra datos de sensores a CSV cada 1 segundo post-baseline.
+    write_data()/write_baseline_metadata() sólo toman la foto de los valores y la encolan;
+    un hilo escritor formatea, escribe y hace flush por lotes (tamaño/tiempo).
+    blocking=True espera cuando la cola está llena en vez de descartar (modo batch)."""
+    def __init__(self, filename=None, blocking=False):
         import csv
         from datetime import datetime
         self.csv = csv
@@ -224,19 +531,82 @@ class DataRecorder:
         self.filename = filename
         self.file = None
         self.writer = None
+        self.channel_fields = []  # columnas {canal}_{banda}_* (formato compacto en CSV)
         self.last_write_time = None
         self.baseline_data_written = False
+        self.blocking = blocking
+        self.queue = queue.Queue(maxsize=RECORDER_QUEUE_SIZE)
+        self.thread = None
+        self.rows_written = 0
+        self.dropped = 0      # filas descartadas por cola llena
+        self.max_depth = 0    # máxima profundidad de cola observada
+        self.flushes = 0
         
     def start(self):
         """Abre archivo e inicia grabación"""
         try:
-            self.file = open(self.filename, 'w', newline='')
-            self.writer = self.csv.DictWriter(self.file, fieldnames=self._get_fieldnames())
-            self.writer.writeheader()
-            self.file.flush()
-            safe_print(f"📁 Grabando datos en: {self.filename}")
+            self._open()
+            self.thread = threading.Thread(target=self._writer_loop, name="data-recorder", daemon=True)
+            self.thread.start()
         except Exception as e:
-            safe_print(f"Error iniciando DataRecorder: {e}")
+            safe_print(f"Error iniciando {type(self).__name__}: {e}")
+            self.file = None
+    
+    def _open(self):
+        self.file = open(self.filename, 'w', newline='')
+        fields = self._get_fieldnames()
+        self.channel_fields = [f for f in fields if f.split('_', 1)[0].upper() in EEG_CHANNELS]
+        self.writer = self.csv.DictWriter(self.file, fieldnames=fields)
+        self.writer.writeheader()
+        self.file.flush()
+        safe_print(f"📁 Grabando datos en: {self.filename}")
+    
+    @property
+    def queue_depth(self):
+        return self.queue.qsize()
+    
+    def _enqueue(self, item):
+        if self.blocking:
+            self.queue.put(item)
+        else:
+            try:
+                self.queue.put_nowait(item)
+            except queue.Full:
+                self.dropped += 1
+                return
+        self.max_depth = max(self.max_depth, self.queue.qsize())
+    
+    def _writer_loop(self):
+        """Hilo escritor: drena la cola y hace flush cada RECORDER_FLUSH_ROWS filas o RECORDER_FLUSH_SEC"""
+        pending = 0
+        last_flush = time.monotonic()
+        while True:
+            try:
+                item = self.queue.get(timeout=RECORDER_FLUSH_SEC)
+            except queue.Empty:
+                item = ('tick', None)
+            kind, payload = item if item is not None else ('stop', None)
+            try:
+                if kind == 'row':
+                    self._write_row(payload)
+                    self.rows_written += 1
+                    pending += 1
+                elif kind == 'meta':
+                    self._write_metadata(payload)
+                    pending += 1
+                if pending and (kind in ('meta', 'stop') or pending >= RECORDER_FLUSH_ROWS
+                                or time.monotonic() - last_flush >= RECORDER_FLUSH_SEC):
+                    self._flush()
+                    self.flushes += 1
+                    pending = 0
+                    last_flush = time.monotonic()
+            except Exception as e:
+                safe_print(f"Error escribiendo datos: {e}")
+            if kind == 'stop':
+                return
+    
+    def _flush(self):
+        self.file.flush()
             
     def _get_fieldnames(self):
         """Retorna lista de campos para el CSV"""
@@ -247,6 +617,12 @@ class DataRecorder:
             for band in ['delta', 'theta', 'alpha', 'beta', 'gamma']:
                 fields.extend([f'{band}_rms', f'{band}_env', f'{band}_cc'])
         
+        # EEG por canal (modo individual): {canal}_{banda}_{rms|env|senv|cc}
+        if use_eeg and eeg_processing_mode == 'individual':
+            for ch in EEG_CHANNELS:
+                for band in ['delta', 'theta', 'alpha', 'beta', 'gamma']:
+                    fields.extend(f'{ch.lower()}_{band}_{col}' for col, _ in CHANNEL_COLUMNS)
+        
         # Acelerómetro
         if use_acc:
             fields.extend(['acc_x', 'acc_y', 'acc_z', 'acc_x_dev', 'acc_y_dev', 'acc_z_dev'])
@@ -257,47 +633,106 @@ class DataRecorder:
         
         return fields
     
+    def _baseline_metadata(self):
+        """Baseline EEG/ACC como dict numérico (lo usan los comentarios CSV y el header binario)"""
+        meta = {'eeg': {}, 'acc': {}}
+        if use_eeg and baseline_eeg_values:
+            for band in ['delta', 'theta', 'alpha', 'beta', 'gamma']:
+                if band in baseline_eeg_values:
+                    meta['eeg'][band] = {k: float(baseline_eeg_values[band].get(k, 0.0)) for k in ('mu', 'sigma', 'min', 'max')}
+        if use_eeg and eeg_processing_mode == 'individual':
+            meta['eeg_channels'] = {
+                ch: {band: {k: float(v.get(k, 0.0)) for k in ('mu', 'sigma', 'min', 'max')}
+                     for band, v in baseline_eeg_values_per_channel[ch].items()}
+                for ch in EEG_CHANNELS
+            }
+        if use_acc:
+            for axis, var_name in [('x', baseline_acc_x), ('y', baseline_acc_y), ('z', baseline_acc_z)]:
+                if var_name and var_name.get('neutral') is not None:
+                    meta['acc'][axis] = {k: float(var_name.get(k, 0.0)) for k in ('neutral', 'range', 'min', 'max', 'sigma')}
+        return meta
+    
     def write_baseline_metadata(self):
-        """Escribe información del baseline como comentarios (se llama post-baseline)"""
+        """Encola la información del baseline (se llama post-baseline, una vez)"""
         if self.baseline_data_written or self.file is None:
             return
-            
         try:
-            self.file.write("\n# === BASELINE DATA ===\n")
-            
-            # EEG Baseline
-            if use_eeg and baseline_eeg_values:
-                for band in ['delta', 'theta', 'alpha', 'beta', 'gamma']:
-                    if band in baseline_eeg_values:
-                        mu = baseline_eeg_values[band].get('mu', 0.0)
-                        sigma = baseline_eeg_values[band].get('sigma', 0.0)
-                        min_val = baseline_eeg_values[band].get('min', 0.0)
-                        max_val = baseline_eeg_values[band].get('max', 0.0)
-                        self.file.write(f"# {band.upper()}: μ={float(mu):.3f} σ={float(sigma):.3f} min={float(min_val):.3f} max={float(max_val):.3f}\n")
-            
-            # ACC Baseline
-            if use_acc:
-                for axis, var_name in [('x', baseline_acc_x), ('y', baseline_acc_y), ('z', baseline_acc_z)]:
-                    if var_name and var_name.get('neutral') is not None:
-                        neutral = float(var_name.get('neutral', 0.0))
-                        min_val = float(var_name.get('min', 0.0))
-                        max_val = float(var_name.get('max', 0.0))
-                        range_val = float(var_name.get('range', 0.0))
-                        sigma = float(var_name.get('sigma', 0.0))
-                        self.file.write(f"# ACC_{axis.upper()}: neutral={neutral:+.4f} range={range_val:.4f} [{min_val:+.4f}, {max_val:+.4f}] σ={sigma:.4f}\n")
-            
-            self.file.write("# === DATA START ===\n")
-            self.file.flush()
+            self._enqueue(('meta', self._baseline_metadata()))
             self.baseline_data_written = True
         except Exception as e:
             safe_print(f"Error escribiendo baseline metadata: {e}")
     
+    def _write_metadata(self, meta):
+        """Escribe el baseline como comentarios en el CSV (hilo escritor)"""
+        self.file.write("\n# === BASELINE DATA ===\n")
+        
+        # EEG Baseline
+        for band, b in meta['eeg'].items():
+            self.file.write(f"# {band.upper()}: μ={b['mu']:.3f} σ={b['sigma']:.3f} min={b['min']:.3f} max={b['max']:.3f}\n")
+        
+        # EEG Baseline por canal (modo individual)
+        for ch, ch_bands in meta.get('eeg_channels', {}).items():
+            for band, b in ch_bands.items():
+                self.file.write(f"# {ch}_{band.upper()}: μ={b['mu']:.3f} σ={b['sigma']:.3f} min={b['min']:.3f} max={b['max']:.3f}\n")
+        
+        # ACC Baseline
+        for axis, a in meta['acc'].items():
+            self.file.write(f"# ACC_{axis.upper()}: neutral={a['neutral']:+.4f} range={a['range']:.4f} [{a['min']:+.4f}, {a['max']:+.4f}] σ={a['sigma']:.4f}\n")
+        
+        self.file.write("# === DATA START ===\n")
+    
+    def _collect_row(self, now, elapsed_seconds):
+        """Foto de los valores numéricos de la fila actual (None = sin dato)"""
+        row = {'timestamp': now, 'time_sec': elapsed_seconds}
+        
+        # EEG
+        if use_eeg:
+            for band in ['delta', 'theta', 'alpha', 'beta', 'gamma']:
+                row[f'{band}_rms'] = bands[band].get('rms')
+                row[f'{band}_env'] = bands[band].get('env')
+                row[f'{band}_cc'] = bands[band].get('cc')
+        
+        # EEG por canal
+        if use_eeg and eeg_processing_mode == 'individual':
+            for ch in EEG_CHANNELS:
+                for band in ['delta', 'theta', 'alpha', 'beta', 'gamma']:
+                    state = bands_per_channel[ch][band]
+                    for col, key in CHANNEL_COLUMNS:
+                        row[f'{ch.lower()}_{band}_{col}'] = state.get(key)
+        
+        # ACC
+        if use_acc:
+            for axis in ['x', 'y', 'z']:
+                row[f'acc_{axis}'] = acc.get(axis)
+                # Calcular desviación actual
+                row[f'acc_{axis}_dev'] = acc.get(axis, 0) - acc_baseline.get(axis, 0)
+        
+        # PPG
+        if use_ppg:
+            row['ppg_bpm'] = ppg.get('bpm')
+            row['ppg_cc'] = ppg.get('cc')
+        return row
+    
+    def _write_row(self, row):
+        """Formatea la fila como texto CSV, mismo formato que siempre (hilo escritor)"""
+        out = {k: ('' if v is None else v) for k, v in row.items()}
+        out['timestamp'] = self.datetime.fromtimestamp(row['timestamp']).isoformat()
+        out['time_sec'] = f"{row['time_sec']:.1f}"
+        for k in self.channel_fields:
+            v = row.get(k)
+            if isinstance(v, float) and not k.endswith('_cc'):
+                out[k] = f"{v:.6g}"  # 80 columnas por canal: 6 cifras bastan y el CSV no se dispara
+        for axis in ['x', 'y', 'z']:
+            if f'acc_{axis}_dev' in row:
+                out[f'acc_{axis}_dev'] = f"{row[f'acc_{axis}_dev']:.4f}"
+        self.writer.writerow(out)
+    
     def write_data(self, elapsed_seconds):
         """Escribe una fila de datos si pasó 1 segundo desde la última"""
-        if self.file is None or self.writer is None:
+        if self.file is None:
             return
         
-        now = time.time()
+        now = clock_time()
         if self.last_write_time is None:
             self.last_write_time = now
         
@@ -306,48 +741,378 @@ class DataRecorder:
             return
         
         try:
-            row = {
-                'timestamp': self.datetime.now().isoformat(),
-                'time_sec': f"{elapsed_seconds:.1f}"
-            }
-            
-            # EEG
-            if use_eeg:
-                for band in ['delta', 'theta', 'alpha', 'beta', 'gamma']:
-                    row[f'{band}_rms'] = bands[band].get('rms', '')
-                    row[f'{band}_env'] = bands[band].get('env', '')
-                    row[f'{band}_cc'] = bands[band].get('cc', '')
-            
-            # ACC
-            if use_acc:
-                for axis in ['x', 'y', 'z']:
-                    row[f'acc_{axis}'] = acc.get(axis, '')
-                    # Calcular desviación actual
-                    baseline_val = acc_baseline.get(axis, 0)
-                    current_val = acc.get(axis, 0)
-                    row[f'acc_{axis}_dev'] = f"{current_val - baseline_val:.4f}"
-            
-            # PPG
-            if use_ppg:
-                row['ppg_bpm'] = ppg.get('bpm', '')
-                row['ppg_cc'] = ppg.get('cc', '')
-            
-            self.writer.writerow(row)
-            self.file.flush()
+            self._enqueue(('row', self._collect_row(now, elapsed_seconds)))
             self.last_write_time = now
         except Exception as e:
             safe_print(f"Error escribiendo datos: {e}")
     
+    def stats_line(self):
+        return (f"[REC] filas: {self.rows_written} | cola: {self.queue_depth} (máx {self.max_depth}/{RECORDER_QUEUE_SIZE}) "
+                f"| descartadas: {self.dropped} | flushes: {self.flushes}")
+    
+    def _stop_writer(self):
+        """Vacía la cola y detiene el hilo escritor"""
+        if self.thread is not None:
+            self.queue.put(None)  # bloqueante: el marcador de fin nunca se descarta
+            self.thread.join(timeout=10.0)
+            self.thread = None
+    
     def close(self):
-        """Cierra el archivo"""
+        """Vacía la cola y cierra el archivo"""
         if self.file:
             try:
+                self._stop_writer()
                 self.file.close()
                 safe_print(f"✅ Datos guardados: {self.filename}")
+                safe_print(self.stats_line())
+            except Exception as e:
+                safe_print(f"Error cerrando archivo: {e}")
+
+
+# --- Formato binario de sesión (.bses) ---
+# [0:8]    magic b"BIOSES1\n"
+# [8:12]   uint32 LE: largo del header JSON
+# [12:...] header JSON (campos, dtype, config DSP, baseline, filas), relleno hasta BSES_HEADER_SIZE
+# [BSES_HEADER_SIZE:] registros NumPy de tamaño fijo (little-endian), sin separadores
+# El número de filas se deduce del tamaño del archivo, así una sesión cortada sigue siendo legible.
+BSES_MAGIC = b"BIOSES1\n"
+BSES_HEADER_SIZE = 65536
+BSES_BLOCK_ROWS = 16  # Filas acumuladas antes de cada escritura a disco
+
+BSES_F8_FIELDS = ('timestamp', 'time_sec')
+
+def bses_dtype(fields, f8_fields=BSES_F8_FIELDS):
+    """timestamp/time_sec (y los f8_fields del header) en float64, el resto en float32"""
+    return np.dtype([(f, '<f8' if f in f8_fields else '<f4') for f in fields])
+
+def write_bses_header(f, header):
+    """(Re)escribe el header al inicio del archivo sin mover la posición de escritura"""
+    import json
+    payload = json.dumps(header, ensure_ascii=False).encode('utf-8')
+    if len(payload) + 12 > BSES_HEADER_SIZE:
+        raise ValueError(f"Header .bses demasiado grande ({len(payload)} bytes)")
+    pos = f.tell()
+    f.seek(0)
+    f.write(BSES_MAGIC + len(payload).to_bytes(4, 'little') + payload.ljust(BSES_HEADER_SIZE - 12, b' '))
+    f.seek(max(pos, BSES_HEADER_SIZE))
+
+def load_bses(filename, mmap=True):
+    """Abre una sesión .bses → (header, registros). Con mmap=True no lee los datos a memoria."""
+    import json, os
+    with open(filename, 'rb') as f:
+        if f.read(8) != BSES_MAGIC:
+            raise ValueError(f"{filename} no es una sesión .bses")
+        header = json.loads(f.read(int.from_bytes(f.read(4), 'little')).decode('utf-8'))
+    dtype = bses_dtype(header['fields'], header.get('f8_fields', BSES_F8_FIELDS))
+    rows = (os.path.getsize(filename) - BSES_HEADER_SIZE) // dtype.itemsize
+    if rows <= 0:
+        return header, np.zeros(0, dtype)
+    if mmap:
+        return header, np.memmap(filename, dtype=dtype, mode='r', offset=BSES_HEADER_SIZE, shape=(rows,))
+    return header, np.fromfile(filename, dtype=dtype, count=rows, offset=BSES_HEADER_SIZE)
+
+class BinaryDataRecorder(DataRecorder):
+    """Mismas filas que DataRecorder, pero en registros binarios de tamaño fijo (.bses)"""
+    def __init__(self, filename=None, blocking=False):
+        super().__init__(filename, blocking)
+        if filename is None:
+            self.filename = self.filename[:-4] + ".bses"
+        self.block = None
+        self.n_block = 0
+        self.rows = 0
+        self.header = None
+
+    def _open(self):
+        """Abre archivo y reserva el header"""
+        fields = self._get_fieldnames()
+        self.block = np.zeros(BSES_BLOCK_ROWS, dtype=bses_dtype(fields))
+        self.header = {
+            'format': 'bses', 'version': 1, 'kind': 'summary',
+            'created': self.datetime.now().isoformat(),
+            'fields': fields,
+            'config': {'srate': SRATE, 'win': WIN, 'step': STEP, 'band_engine': band_engine_mode,
+                       'eeg_mode': eeg_processing_mode, 'bands': BAND_EDGES,
+                       'adaptive_tau_sec': adaptive_tau_sec if adaptive_baseline else None,
+                       'robust_bands': sorted(robust_bands)},
+            'baseline': None, 'rows': 0,
+        }
+        self.file = open(self.filename, 'w+b')
+        write_bses_header(self.file, self.header)
+        safe_print(f"📁 Grabando datos (binario) en: {self.filename}")
+
+    def _write_metadata(self, meta):
+        """Guarda el baseline en el header JSON (en vez de comentarios)"""
+        self.header['baseline'] = meta
+        self.header['data_start_row'] = self.rows + self.n_block
+        write_bses_header(self.file, self.header)
+
+    def _write_row(self, row):
+        nan = float('nan')
+        self.block[self.n_block] = tuple(nan if row.get(f) is None else row[f] for f in self.block.dtype.names)
+        self.n_block += 1
+        if self.n_block == len(self.block):
+            self._flush_block()
+
+    def _flush_block(self):
+        if self.n_block:
+            self.file.write(self.block[:self.n_block].tobytes())
+            self.rows += self.n_block
+            self.n_block = 0
+
+    def _flush(self):
+        self._flush_block()
+        self.file.flush()
+
+    def close(self):
+        """Vacía el último bloque, actualiza el header y cierra"""
+        if self.file:
+            try:
+                self._stop_writer()
+                self._flush_block()
+                self.header['rows'] = self.rows
+                write_bses_header(self.file, self.header)
+                self.file.close()
+                safe_print(f"✅ Datos guardados: {self.filename} ({self.rows} filas)")
+                safe_print(self.stats_line())
             except Exception as e:
                 safe_print(f"Error cerrando archivo: {e}")
 
 
+class BackgroundWriter:
+    """Hilo dedicado que escribe bloques de bytes a un archivo: quien llama a write()
+    sólo encola, nunca espera al disco. Los bloques pendientes se juntan en una escritura."""
+    def __init__(self, f, name="writer"):
+        self.file = f
+        self.queue = queue.Queue()
+        self.bytes_written = 0
+        self.writes = 0
+        self.errors = 0
+        self.thread = threading.Thread(target=self._loop, name=name, daemon=True)
+        self.thread.start()
+
+    def write(self, data):
+        self.queue.put(data)
+
+    def _loop(self):
+        while True:
+            chunks = [self.queue.get()]
+            while True:
+                try:
+                    chunks.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            data = b''.join(c for c in chunks if c is not None)
+            if data:
+                try:
+                    self.file.write(data)
+                    self.file.flush()
+                    self.bytes_written += len(data)
+                    self.writes += 1
+                except Exception:
+                    self.errors += 1
+            if None in chunks:
+                return
+
+    def close(self, timeout=5.0):
+        """Espera a que se escriba todo lo encolado (no cierra el archivo)"""
+        self.queue.put(None)
+        self.thread.join(timeout=timeout)
+
+
+# --- Grabación cruda a tasa completa (EEG 256 Hz + ACC/PPG) ---
+# Un .bses por stream con kind='raw', para poder re-procesar la sesión con otros filtros.
+RAW_EEG_FIELDS = ['timestamp', 'tp9', 'af7', 'af8', 'tp10', 'aux_l', 'aux_r']
+RAW_STREAMS = {
+    'eeg': (RAW_EEG_FIELDS, 2048),  # (campos, filas por bloque escrito) ≈ 8 s de EEG
+    'acc': (['timestamp', 'x', 'y', 'z'], 256),
+    'ppg': (['timestamp', 'ppg1', 'ppg2', 'ppg3'], 256),
+}
+RAW_F8_FIELDS = ('timestamp', 'ppg1', 'ppg2', 'ppg3')  # PPG ~1.25e8: float32 perdería resolución
+
+class RawSampleRecorder:
+    """Graba cada muestra cruda en bloques grandes escritos por un BackgroundWriter por stream"""
+    def __init__(self, prefix=None, streams=('eeg', 'acc', 'ppg')):
+        from datetime import datetime
+        if prefix is None:
+            prefix = f"meditacion_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        self.prefix = prefix
+        self.names = streams
+        self.streams = {}
+        self.eeg_next_t = None  # reloj de muestras EEG (timestamp estimado de la próxima muestra)
+        self.dropped = 0
+
+    def start(self):
+        from datetime import datetime
+        for name in self.names:
+            fields, block_rows = RAW_STREAMS[name]
+            filename = f"{self.prefix}_raw_{name}.bses"
+            try:
+                f = open(filename, 'w+b', buffering=1 << 20)
+                header = {
+                    'format': 'bses', 'version': 1, 'kind': 'raw', 'stream': name,
+                    'created': datetime.now().isoformat(), 'fields': fields,
+                    'f8_fields': [c for c in fields if c in RAW_F8_FIELDS],
+                    'config': {'srate': SRATE, 'eeg_channels': EEG_CHANNELS}, 'rows': 0,
+                }
+                write_bses_header(f, header)
+                f.flush()
+                self.streams[name] = {
+                    'file': f, 'filename': filename, 'header': header, 'rows': 0, 'n': 0,
+                    'buf': np.zeros(block_rows, dtype=bses_dtype(fields, header['f8_fields'])),
+                    'writer': BackgroundWriter(f, name=f"raw-{name}"),
+                }
+            except Exception as e:
+                safe_print(f"Error iniciando grabación cruda ({name}): {e}")
+        if self.streams:
+            safe_print(f"📁 Grabando señal cruda en: {self.prefix}_raw_{{{','.join(self.streams)}}}.bses")
+
+    def _append(self, name, rows):
+        """rows: arreglo (n, n_campos) con timestamp en la columna 0"""
+        st = self.streams.get(name)
+        if st is None:
+            self.dropped += len(rows)
+            return
+        buf = st['buf']
+        i = 0
+        while i < len(rows):
+            take = min(len(rows) - i, len(buf) - st['n'])
+            for j, field in enumerate(buf.dtype.names):
+                buf[field][st['n']:st['n'] + take] = rows[i:i + take, j]
+            st['n'] += take
+            i += take
+            if st['n'] == len(buf):
+                self._flush(st)
+
+    def _flush(self, st):
+        if st['n']:
+            st['writer'].write(st['buf'][:st['n']].tobytes())
+            st['rows'] += st['n']
+            st['n'] = 0
+
+    def append_eeg(self, block, arrival=None):
+        """block (n, n_vals) recién recibido. Timestamps: reloj de muestras a SRATE anclado a la
+        llegada del bloque; salta hacia adelante si la llegada se adelanta más de 0.25 s
+        (pérdidas, pausas del stream). Nunca retrocede: los timestamps son monótonos."""
+        n = block.shape[0]
+        arrival = time.time() if arrival is None else arrival
+        start = arrival - (n - 1) / SRATE
+        if self.eeg_next_t is not None and start - self.eeg_next_t < 0.25:
+            start = self.eeg_next_t
+        self.eeg_next_t = start + n / SRATE
+        rows = np.full((n, len(RAW_EEG_FIELDS)), np.nan)
+        rows[:, 0] = start + np.arange(n) / SRATE
+        width = min(block.shape[1], len(RAW_EEG_FIELDS) - 1)
+        rows[:, 1:1 + width] = block[:, :width]
+        self._append('eeg', rows)
+
+    def append_acc(self, x, y, z):
+        self._append('acc', np.array([[time.time(), x, y, z]], dtype=float))
+
+    def append_ppg(self, vals):
+        row = [time.time()] + [np.nan if v is None else float(v) for v in vals[:3]]
+        row += [np.nan] * (4 - len(row))
+        self._append('ppg', np.array([row], dtype=float))
+
+    def close(self):
+        """Vacía los buffers, espera a los writers y actualiza los headers"""
+        streams, self.streams = self.streams, {}  # desde aquí los handlers cuentan como descartadas
+        for name, st in streams.items():
+            try:
+                self._flush(st)
+                st['writer'].close()
+                st['header']['rows'] = st['rows']
+                write_bses_header(st['file'], st['header'])
+                st['file'].close()
+                w = st['writer']
+                safe_print(f"✅ Crudo {name}: {st['filename']} ({st['rows']} muestras, {w.bytes_written/1e6:.1f} MB en {w.writes} escrituras"
+                           + (f", {w.errors} errores" if w.errors else "") + ")")
+            except Exception as e:
+                safe_print(f"Error cerrando grabación cruda ({name}): {e}")
+
+raw_recorder = None  # RawSampleRecorder activo (los handlers le pasan cada muestra)
+
+# --- Re-procesamiento batch de una grabación cruda ---
+BATCH_BLOCK = 64  # Muestras EEG por llamada a process_eeg_block (los hops se cortan igual que en vivo)
+
+def batch_reprocess():
+    """Pasa una grabación cruda (*_raw_eeg.bses + acc/ppg) por la misma cadena DSP en vivo
+    (process_eeg_block, baseline, z-score/env, muse_acc, muse_ppg) tan rápido como da la CPU.
+    El tiempo lo marca la grabación (virtual_now); el resultado va a una sesión nueva."""
+    global virtual_now, proc_client, show_realtime_data
+    prefix = batch_raw_eeg[:-len('_raw_eeg.bses')]
+    header, eeg = load_bses(batch_raw_eeg)
+    acc_rec = load_bses(prefix + '_raw_acc.bses')[1] if use_acc else None
+    ppg_rec = load_bses(prefix + '_raw_ppg.bses')[1] if use_ppg else None
+    if len(eeg) == 0:
+        print(f"❌ {os.path.basename(batch_raw_eeg)} no tiene muestras"); return
+    if header.get('config', {}).get('srate', SRATE) != SRATE:
+        print(f"⚠️ La grabación es de {header['config']['srate']} Hz y el procesamiento asume {SRATE} Hz")
+    
+    # Sin salidas en tiempo real: ni OSC ni refresco de pantalla por hop
+    proc_client = None
+    show_realtime_data = False
+    
+    out_name = f"{os.path.basename(prefix)}_reproc_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{'bses' if record_format == 'bses' else 'csv'}"
+    recorder = (BinaryDataRecorder if record_format == 'bses' else DataRecorder)(out_name, blocking=True)
+    recorder.start()
+    
+    t = np.asarray(eeg['timestamp'], dtype=float)
+    channels = [c for c in RAW_EEG_FIELDS[1:] if c in eeg.dtype.names]
+    acc_t = np.asarray(acc_rec['timestamp'], dtype=float) if acc_rec is not None else np.zeros(0)
+    ppg_t = np.asarray(ppg_rec['timestamp'], dtype=float) if ppg_rec is not None else np.zeros(0)
+    ia = ip = 0
+    baseline_time = t[0]
+    metadata_written = False
+    n = len(t)
+    last_pct = -1
+    done = 0  # muestras EEG ya procesadas (bloques completos)
+    completed = False
+    t_wall = time.perf_counter()
+    print(f"\n⚙️  Re-procesando {n} muestras EEG ({(t[-1] - t[0]) / 60:.1f} min) de {os.path.basename(batch_raw_eeg)}...")
+    try:
+        for i in range(0, n, BATCH_BLOCK):
+            j = min(n, i + BATCH_BLOCK)
+            block_end = t[j - 1]
+            # ACC/PPG intercalados por timestamp hasta el final del bloque EEG
+            ka = int(np.searchsorted(acc_t, block_end, 'right'))
+            for k in range(ia, ka):
+                virtual_now = acc_t[k]
+                r = acc_rec[k]; muse_acc(None, float(r['x']), float(r['y']), float(r['z']))
+            kp = int(np.searchsorted(ppg_t, block_end, 'right'))
+            for k in range(ip, kp):
+                virtual_now = ppg_t[k]
+                r = ppg_rec[k]; muse_ppg(None, float(r['ppg1']), float(r['ppg2']), float(r['ppg3']))
+            ia, ip = ka, kp
+            
+            virtual_now = block_end
+            block = np.column_stack([np.asarray(eeg[c][i:j], dtype=float) for c in channels])
+            process_eeg_block(block)
+            
+            if baseline_done:
+                if not metadata_written:
+                    recorder.write_baseline_metadata()
+                    metadata_written = True
+                recorder.write_data(virtual_now - baseline_time)
+            
+            pct = j * 100 // n
+            if pct // 5 != last_pct // 5:
+                sys.stdout.write(f"\r[BATCH] {'█' * (pct // 5)}{'░' * (20 - pct // 5)} {pct:3d}% | ⏱️  {block_end - t[0]:7.1f}s de sesión")
+                sys.stdout.flush()
+                last_pct = pct
+            done = j
+        completed = True
+    except KeyboardInterrupt:
+        print("\n✋ Re-procesamiento interrumpido")
+    finally:
+        virtual_now = None
+        elapsed = time.perf_counter() - t_wall
+        recorder.close()
+        if completed:
+            print(f"\n✅ {done} muestras en {elapsed:.1f}s ({(t[done - 1] - t[0]) / max(elapsed, 1e-9):.0f}x tiempo real) → {out_name}")
+        else:
+            print(f"\n❌ Re-procesamiento incompleto: {done} de {n} muestras en {elapsed:.1f}s → {out_name} (parcial)")
+
+
 def trigger_recalibration():
     """Inicia la rutina de recalibración en un hilo separado."""
     if in_recalibration:
@@ -383,80 +1148,58 @@ def return_to_menu(exit_app=False):
 
 
 def recalibration_routine():
-    """Rutina que pausa salidas, recolecta baseline y mantiene envíos simulados a TD."""
-    global in_recalibration, pause_outputs, baseline_done, baseline_eeg_done, baseline_acc_neutral_done, baseline_acc_movement_done, baseline_acc_done, frames_left, frames_left_acc_neutral, frames_left_acc_movement
-    global acc_neutral_start_time, acc_movement_start_time
-    global baseline_eeg_start_sent, baseline_acc_neutral_start_sent, baseline_acc_movement_start_sent
+    """Recalibra en segundo plano: el baseline nuevo se acumula en los 'stats' de cada banda (vacíos
+    después de la calibración) mientras el actual sigue generando las salidas reales. El EEG lo cambia
+    el hilo de procesamiento en el hop que completa la fase (swap_eeg_baseline); en el ACC el handler
+    sólo acumula muestras y este hilo publica el progreso y cierra las fases (close_baseline_acc
+    reemplaza acc_baseline de una vez). No hay pausa ni animación simulada."""
+    global in_recalibration, recal_eeg_frames, recal_acc_phase, recal_acc_t0, recal_acc_last
+    if is_simulation or not baseline_done:
+        print("⚠️ La recalibración requiere un baseline inicial completo.")
+        return
     in_recalibration = True
-    pause_outputs = True
-    print("\n🔔 Recalibración iniciada: recolectando baseline...\n")
-
-    # Reset buffers/counters
-    if use_eeg:
-        for n in bands: bands[n]['buf'] = []
-        baseline_done = False
-        baseline_eeg_done = False
-        frames_left = int(BASE_SEC / (STEP / SRATE))
-        baseline_eeg_start_sent = False
-    if use_acc:
-        for a in acc:
-            acc_rng[a]['min'] = None; acc_rng[a]['max'] = None
-            acc_rng[a]['values'] = []
-            acc_rng[a]['neutral_min'] = None; acc_rng[a]['neutral_max'] = None
-        baseline_acc_neutral_done = False
-        baseline_acc_movement_done = False
-        baseline_acc_done = False
-        frames_left_acc_neutral = int(baseline_acc_neutral_duration / (STEP / SRATE))
-        frames_left_acc_movement = 0
-        acc_neutral_start_time = None
-        acc_movement_start_time = None
-        baseline_acc_neutral_start_sent = False
-        baseline_acc_movement_start_sent = False
-
-    t_sim = 0.0
+    print("\n🔔 Recalibración iniciada en segundo plano (las salidas siguen con el baseline actual)...\n")
     try:
-        while True:
-            # generar simulación visual corta para TD (mantener actividad)
-            s0 = 0.9 * math.sin(0.2 * t_sim + 0.0)
-            s1 = 1.1 * math.sin(0.4 * t_sim + 1.5)
-            s2 = 1.0 * math.sin(0.6 * t_sim + 3.0)
-            s3 = 0.8 * math.sin(1.0 * t_sim + 4.5)
-            s4 = 0.6 * math.sin(1.5 * t_sim + 6.0)
-            osc_signed = [s0, s1, s2, s3, s4]
-            osc_env = [abs(v) for v in osc_signed]
-
-            # raw: usar mu actuales si existen, sino defaults
-            raw_vals = []
-            for n in list(FILTS.keys()):
-                mu = bands[n].get('mu')
-                if mu is None: mu = MU_DEFAULTS.get(n, 1.0)
-                raw_vals.append(round(float(mu), 3))
-
-            # enviar a TD FORZANDO (para que la visual no se congele)
-            send_proc("/py/bands_signed_env", osc_signed, force=True)
-            send_proc("/py/bands_env", osc_env, force=True)
-            send_proc("/py/bands_raw", raw_vals, force=True)
-            send_proc("/py/acc", [acc['x'], acc['y'], acc['z']], force=True)
-
-            time.sleep(PERIOD)
-            t_sim += PERIOD
-
-            # condición de salida: cuando todos los baselines completaron
-            eeg_ok = (not use_eeg) or baseline_eeg_done
-            acc_ok = (not use_acc) or (baseline_acc_neutral_done and baseline_acc_movement_done)
-            if eeg_ok and acc_ok:
-                break
-
+        if use_eeg:
+            for n in bands: bands[n]['stats'].reset()
+            for ch in bands_per_channel:
+                for n in bands_per_channel[ch]: bands_per_channel[ch][n]['stats'].reset()
+            send_baseline_event("eeg", "start", BASE_SEC)
+            print(f"🧠 Baseline EEG sombra: {BASE_SEC}s...")
+            recal_eeg_frames = int(BASE_SEC / (STEP / SRATE))
+            while recal_eeg_frames > 0 and threads_active:
+                time.sleep(PERIOD)
+        if use_acc:
+            for a in acc:
+                acc_rng[a]['neutral'].reset(); acc_rng[a]['movement'].reset()
+            print(f"🔄 Baseline ACC sombra: Posición Neutra ({baseline_acc_neutral_duration}s)...")
+            print("   ⚠️ MANTÉN CABEZA EN POSICIÓN NEUTRAL\n")
+            for phase, duration in (('neutral', baseline_acc_neutral_duration),
+                                    ('movement', baseline_acc_movement_duration)):
+                if phase == 'movement':
+                    print("✅ Posición neutra CAPTURADA")
+                    print(f"🔄 Rango de movimiento ({duration}s): ¡MUEVE TU CABEZA en todas direcciones!\n")
+                recal_acc_t0 = recal_acc_last = None
+                recal_acc_phase = phase
+                send_baseline_event(f"acc_{phase}", "start", duration)
+                elapsed = 0.0
+                while elapsed < duration and threads_active:
+                    time.sleep(PERIOD)
+                    if recal_acc_t0 is not None:
+                        elapsed = recal_acc_last - recal_acc_t0
+                        send_baseline_event(f"acc_{phase}", "progress", max(0, min(100, int(elapsed / duration * 100))))
+                recal_acc_phase = None
+                if not threads_active:
+                    return
+                send_baseline_event(f"acc_{phase}", "end")
+            for a in acc:
+                rng = acc_rng[a]
+                if rng['movement'].count:
+                    rng['min'], rng['max'] = rng['movement'].min, rng['movement'].max
+            close_baseline_acc()
     finally:
-        # Asegurarse que los cierres de baseline se ejecuten
-        if use_eeg and not baseline_eeg_done:
-            try: close_baseline_eeg()
-            except Exception: pass
-        if use_acc and not (baseline_acc_neutral_done and baseline_acc_movement_done):
-            try: close_baseline_acc()
-            except Exception: pass
-
-        pause_outputs = False
+        recal_eeg_frames = 0
+        recal_acc_phase = None
         in_recalibration = False
         print("\n✅ Recalibración finalizada.\n")
 
@@ -471,7 +1214,7 @@ def menu_idle_loop():
         try:
             row_start_time = time.time()
             
-            # Generar simulación visual (misma que recalibration_routine)
+            # Generar simulación visual (sin datos reales mientras se elige en el menú)
             s0 = 0.9 * math.sin(0.2 * t_menu + 0.0)
             s1 = 1.1 * math.sin(0.4 * t_menu + 1.5)
             s2 = 1.0 * math.sin(0.6 * t_menu + 3.0)
@@ -481,9 +1224,10 @@ def menu_idle_loop():
             osc_env = [abs(v) for v in osc_signed]
             
             # Enviar a TD FORZANDO (para que la visual no se congele)
-            send_proc("/py/bands_signed_env", osc_signed, force=True)
-            send_proc("/py/bands_env", osc_env, force=True)
-            send_proc("/py/acc", [0.0, 0.0, 0.0], force=True)
+            with osc_bundle_tick():
+                send_proc("/py/bands_signed_env", osc_signed, force=True)
+                send_proc("/py/bands_env", osc_env, force=True)
+                send_proc("/py/acc", [0.0, 0.0, 0.0], force=True)
             
             time.sleep(PERIOD)
             t_menu += PERIOD
@@ -543,10 +1287,19 @@ def listen_shortcuts():
         except Exception:
             pass
 
-SRATE, WIN_S=256, 2; WIN, STEP=SRATE*WIN_S, (SRATE*WIN_S)//2
+SRATE=256
+WIN = int(round(SRATE * window_seconds)); STEP = min(WIN, max(1, int(round(SRATE * hop_ms / 1000.0))))
+WIN_S, HOP_S = WIN / SRATE, STEP / SRATE
 # Usar la duración configurada por el usuario
 BASE_SEC = baseline_duration_seconds if use_eeg and not is_simulation else 10
+eeg_phase_sec = BASE_SEC  # Duración de la fase EEG en curso (BASE_SEC, o el refinamiento de un perfil)
 Z_MAX, ALPHA_ENV, DEAD_ZONE, ALPHA_DIST=3.0, 0.3, 0.2, 0.25
+# ALPHA_ENV está definido para hops de 1 s: se ajusta por hop para mantener la misma
+# constante de tiempo de suavizado EEG con cualquier WIN/STEP
+ALPHA_ENV_EEG = 1.0 - (1.0 - ALPHA_ENV) ** HOP_S
+# Baseline adaptativo: peso por hop de una media exponencial con constante de tiempo adaptive_tau_sec
+ADAPT_ALPHA = 1.0 - math.exp(-HOP_S / adaptive_tau_sec)
+ADAPT_SEND_SEC = 2.0  # Periodo de /py/baseline_mu mientras el baseline se adapta
 UPDATE_HZ=10.0; SLEW_PER_SEC=25; MIN_STEP_CC=1; CURVE_MODE="exp"; CURVE_K=0.65
 PERIOD = 1.0 / UPDATE_HZ
 # ----------
@@ -563,17 +1316,219 @@ CC_NUM={'delta':17,'theta':16,'alpha':14,'beta':15,'gamma':18,'accx':20,'accy':2
 # ---------------
 
 # --- Utilidades Señal ---
-def butter(lo, hi, fs=SRATE): nyq=fs*0.5; return sg.butter(4, [lo/nyq, hi/nyq], 'band')
-FILTS={'delta':butter(0.5,4),'theta':butter(4,8),'alpha':butter(8,13),'beta':butter(13,30),'gamma':butter(30,45)}
-def band_rms(seg, ba):
-    b, a = ba
-    try:
-        f = sg.lfilter(b, a, seg)
-        if f is None or f.size == 0 or np.all(np.isnan(f)): return np.nan
-        rms_val = np.sqrt(np.nanmean(f**2))
-        return rms_val if not np.isnan(rms_val) else np.nan
-    except ValueError: return np.nan
-    except Exception: return np.nan
+def butter(lo, hi, fs=SRATE): nyq=fs*0.5; return sg.butter(4, [lo/nyq, hi/nyq], 'band', output='sos')
+BAND_EDGES={'delta':(0.5,4),'theta':(4,8),'alpha':(8,13),'beta':(13,30),'gamma':(30,45)}
+FILTS={n: butter(lo, hi) for n, (lo, hi) in BAND_EDGES.items()}
+
+class StreamingFilterBank:
+    """Banco de filtros pasa-banda (SOS) con estado persistente por canal y banda.
+    En cada hop se filtran SOLO las muestras nuevas continuando el estado `zi`,
+    y se guardan los cuadrados de la salida de la última ventana para el RMS.
+    Así no se reinicia el filtro en cada ventana (sin transitorio de arranque)."""
+    def __init__(self, filts, n_channels=1, win=WIN):
+        self.names = list(filts)
+        self.sos = [filts[n] for n in self.names]
+        self.n_channels = n_channels
+        self.win = win
+        self.zi = None
+        self.sq = np.zeros((len(self.names), n_channels, win))  # salida filtrada al cuadrado
+        self.filled = 0
+
+    def reset(self):
+        self.zi = None
+        self.sq[:] = 0.0
+        self.filled = 0
+
+    def process(self, block):
+        """Filtra un bloque de muestras nuevas (n_channels, n) y retorna RMS (n_bands, n_channels)"""
+        x = np.asarray(block, dtype=float).reshape(self.n_channels, -1)
+        n = x.shape[-1]
+        if n == 0:
+            return self.rms()
+        if self.zi is None:
+            # Estado inicial en régimen estacionario para el primer valor (evita el escalón del offset DC)
+            self.zi = [sg.sosfilt_zi(sos)[:, None, :] * x[None, :, :1] for sos in self.sos]
+        keep = min(n, self.win)
+        if keep < self.win:
+            self.sq[..., :-keep] = self.sq[..., keep:]
+        for i, sos in enumerate(self.sos):
+            y, self.zi[i] = sg.sosfilt(sos, x, axis=-1, zi=self.zi[i])
+            self.sq[i, :, -keep:] = y[:, -keep:] ** 2
+        self.filled = min(self.win, self.filled + n)
+        return self.rms()
+
+    def process_ring(self, ring):
+        """Consume las muestras pendientes del RingBuffer (vista sin copia)"""
+        return self.process(ring.latest(ring.consume()))
+
+    def rms(self):
+        """RMS de la última ventana por banda y canal (nan si aún no hay datos)"""
+        if self.filled == 0:
+            return np.full((len(self.names), self.n_channels), np.nan)
+        return np.sqrt(self.sq[..., self.win - self.filled:].mean(axis=-1))
+
+class SpectralBandEngine:
+    """Motor espectral alternativo al banco IIR: una rfft (o Welch con ventana
+    Hann cacheada) por canal y por hop, integrando la potencia de cada banda.
+    Retorna el RMS equivalente por banda (raíz de la potencia de banda, Parseval),
+    en la misma escala que StreamingFilterBank. El último espectro queda en
+    `freqs`/`psd` para otras features."""
+    def __init__(self, band_edges, n_channels=1, win=WIN, fs=SRATE, mode='fft'):
+        self.names = list(band_edges)
+        self.n_channels = n_channels
+        self.win = win
+        self.fs = fs
+        self.mode = mode
+        if mode == 'welch':
+            self.nperseg = min(win, fs)  # segmentos de 1 s con 50% de solape
+            self.window = sg.get_window('hann', self.nperseg)
+            self.freqs = np.fft.rfftfreq(self.nperseg, 1.0 / fs)
+        else:
+            self.window = sg.get_window('hann', win)
+            self.freqs = np.fft.rfftfreq(win, 1.0 / fs)
+            # Normalización de Parseval para una ventana Hann de largo win
+            self._norm = 2.0 / (win * np.sum(self.window ** 2))
+        self.df = self.freqs[1] - self.freqs[0]
+        self.masks = [(self.freqs >= lo) & (self.freqs < hi) for lo, hi in band_edges.values()]
+        self.psd = None
+
+    def process(self, window):
+        """window: (n_channels, win) -> RMS (n_bands, n_channels)"""
+        x = np.asarray(window, dtype=float).reshape(self.n_channels, -1)
+        if x.shape[-1] < self.win:
+            return np.full((len(self.names), self.n_channels), np.nan)
+        if self.mode == 'welch':
+            _, self.psd = sg.welch(x, fs=self.fs, window=self.window, nperseg=self.nperseg,
+                                   noverlap=self.nperseg // 2, detrend='constant', axis=-1)
+            power = np.stack([self.psd[:, m].sum(axis=-1) * self.df for m in self.masks])
+        else:
+            x = x - x.mean(axis=-1, keepdims=True)
+            spec = np.fft.rfft(x * self.window, axis=-1)
+            self.psd = (spec.real ** 2 + spec.imag ** 2) * (self._norm / self.df)
+            power = np.stack([self.psd[:, m].sum(axis=-1) * self.df for m in self.masks])
+        return np.sqrt(power)
+
+    def process_ring(self, ring):
+        """Usa la ventana completa del RingBuffer (vista sin copia)"""
+        ring.consume()
+        return self.process(ring.window())
+
+    def reset(self):
+        self.psd = None
+
+def estimate_latency(win=WIN, step=STEP, mode=None):
+    """Estima la latencia extremo a extremo (ms) de la salida EEG para una configuración.
+    Componentes: centro de la ventana, espera media del hop, retardo de grupo del
+    filtro IIR en el centro de cada banda (promedio) y retardo medio del suavizado EMA."""
+    mode = mode or band_engine_mode
+    window_ms = 1000.0 * win / SRATE / 2
+    hop_wait_ms = 1000.0 * step / SRATE / 2
+    filter_ms = 0.0
+    if mode == 'iir':
+        delays = []
+        for n, (lo, hi) in BAND_EDGES.items():
+            # Suma por sección SOS (la forma b/a de orden 8 es numéricamente inestable)
+            delays.append(sum(float(sg.group_delay((sec[:3], sec[3:]), w=[(lo + hi) / 2], fs=SRATE)[1][0]) for sec in FILTS[n]))
+        filter_ms = 1000.0 * np.mean(delays) / SRATE
+    alpha = 1.0 - (1.0 - ALPHA_ENV) ** (step / SRATE)
+    ema_ms = 1000.0 * (step / SRATE) * (1 - alpha) / alpha
+    return dict(window=window_ms, hop=hop_wait_ms, filter=filter_ms, ema=ema_ms,
+                total=window_ms + hop_wait_ms + filter_ms + ema_ms, rate=SRATE / step)
+
+def print_latency_estimate():
+    lat = estimate_latency()
+    print(f"⏱️  Ventana {WIN_S:g}s ({WIN} muestras) | Hop {1000 * HOP_S:g}ms ({STEP} muestras) → {lat['rate']:.1f} actualizaciones/s")
+    print(f"   Latencia estimada ≈ {lat['total']:.0f}ms = ventana {lat['window']:.0f} + hop {lat['hop']:.0f}"
+          f" + filtro {lat['filter']:.0f} + suavizado {lat['ema']:.0f} (ms, sin red)")
+
+def make_band_engine(n_channels=1, mode=None):
+    """Crea el motor de bandas según `band_engine_mode` ('iir', 'fft', 'welch')"""
+    mode = mode or band_engine_mode
+    if mode in ('fft', 'welch'):
+        return SpectralBandEngine(BAND_EDGES, n_channels=n_channels, mode=mode)
+    return StreamingFilterBank(FILTS, n_channels=n_channels)
+
+def benchmark_band_engines(n_channels=len(EEG_CHANNELS), hops=50):
+    """Mide el costo por hop de cada motor de bandas con datos sintéticos"""
+    rng = np.random.default_rng(0)
+    data = 800 + 20 * rng.standard_normal((n_channels, WIN + hops * STEP))
+    results = {}
+    for mode in ('iir', 'fft', 'welch'):
+        ring = RingBuffer(WIN, n_channels=n_channels)
+        engine = make_band_engine(n_channels, mode)
+        ring.append(data[:, :WIN]); engine.process_ring(ring)
+        t0 = time.perf_counter()
+        for k in range(hops):
+            ring.append(data[:, WIN + k * STEP:WIN + (k + 1) * STEP])
+            engine.process_ring(ring)
+        results[mode] = (time.perf_counter() - t0) / hops * 1e6
+    print(f"⏱️  Benchmark motores de bandas ({n_channels} canales, WIN={WIN}, STEP={STEP}):")
+    for mode, us in results.items():
+        print(f"   {mode.upper():6s}: {us:8.1f} µs/hop ({results['iir'] / us:4.1f}x vs IIR)")
+    return results
+
+class RingBuffer:
+    """Buffer circular preasignado (n_channels, capacity) respaldado por NumPy.
+    Cada muestra se escribe dos veces (posición i e i+capacity), así la ventana
+    más reciente es siempre una vista contigua del arreglo: sin copias por hop.
+    `pending` cuenta las muestras llegadas desde el último consume()."""
+    def __init__(self, capacity, n_channels=1):
+        self.capacity = capacity
+        self.n_channels = n_channels
+        self._data = np.zeros((n_channels, 2 * capacity))
+        self._head = 0
+        self.count = 0
+        self.pending = 0
+
+    def append(self, block):
+        """Agrega un bloque (n_channels, n) o (n,) si es de un canal"""
+        x = np.asarray(block, dtype=float).reshape(self.n_channels, -1)
+        n = x.shape[1]
+        self.pending += n
+        cap = self.capacity
+        if n > cap:
+            x = x[:, -cap:]; n = cap
+        h = self._head
+        first = min(n, cap - h)
+        self._data[:, h:h + first] = x[:, :first]
+        self._data[:, h + cap:h + cap + first] = x[:, :first]
+        rest = n - first
+        if rest:
+            self._data[:, :rest] = x[:, first:]
+            self._data[:, cap:cap + rest] = x[:, first:]
+        self._head = (h + n) % cap
+        self.count = min(cap, self.count + n)
+
+    def append_sample(self, sample):
+        """Agrega UNA muestra (escalar o un valor por canal)"""
+        h = self._head
+        self._data[:, h] = sample
+        self._data[:, h + self.capacity] = sample
+        self._head = (h + 1) % self.capacity
+        self.count = min(self.capacity, self.count + 1)
+        self.pending += 1
+
+    def latest(self, n):
+        """Vista (sin copia) de las últimas n muestras, en orden cronológico"""
+        n = min(n, self.count)
+        end = self._head + self.capacity
+        return self._data[:, end - n:end]
+
+    def window(self):
+        """Vista de la ventana completa (las últimas `capacity` muestras)"""
+        return self.latest(self.capacity)
+
+    def consume(self):
+        """Marca las muestras pendientes como procesadas y retorna cuántas eran"""
+        n = self.pending
+        self.pending = 0
+        return n
+
+    def clear(self):
+        self._head = 0
+        self.count = 0
+        self.pending = 0
+
 def env_z(v, mu, sd, prev): # Magnitud
     if sd<=1e-9 or mu is None or math.isnan(v): return prev
     z = abs(v - mu) / sd; current_env = ALPHA_ENV*z+(1-ALPHA_ENV)*prev if z>=DEAD_ZONE else prev*(1-ALPHA_ENV); return max(0.0, current_env)
@@ -618,19 +1573,173 @@ def midi_tick():
 # ---------------
 
 # --- Estados ---
+class RunningStats:
+    """Media/varianza en línea (Welford) + min/max para los baselines: memoria O(1) sin importar
+    la duración de la calibración, y cerrar una fase es leer atributos (no hay arreglos que armar).
+    merge() combina dos acumuladores (fórmula de Chan) como si se hubieran visto todas las muestras."""
+    __slots__ = ('count', 'mean', 'm2', 'min', 'max')
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, x):
+        self.count += 1
+        d = x - self.mean
+        self.mean += d / self.count
+        self.m2 += d * (x - self.mean)
+        if x < self.min: self.min = x
+        if x > self.max: self.max = x
+
+    def merge(self, other):
+        if other.count:
+            n = self.count + other.count
+            d = other.mean - self.mean
+            self.mean += d * other.count / n
+            self.m2 += other.m2 + d * d * self.count * other.count / n
+            self.count = n
+            self.min = min(self.min, other.min)
+            self.max = max(self.max, other.max)
+        return self
+
+    @classmethod
+    def from_summary(cls, count, mean, std, lo, hi):
+        """Acumulador equivalente a `count` muestras con esa media/σ/rango (p. ej. un perfil guardado)"""
+        st = cls()
+        st.count, st.mean, st.m2 = count, mean, std * std * count
+        st.min, st.max = lo, hi
+        return st
+
+    @property
+    def std(self):
+        """Desviación estándar poblacional (ddof=0, como np.std)"""
+        return math.sqrt(self.m2 / self.count) if self.count else 0.0
+
+    # Centro/dispersión que usa el baseline (RobustStats los redefine como mediana/IQR)
+    center = property(lambda self: self.mean)
+    spread = property(lambda self: self.std)
+
+class P2Quantile:
+    """Cuantil p en streaming con el algoritmo P² (Jain & Chlamtac, 1985): 5 marcadores cuyas alturas
+    se ajustan con interpolación parabólica. O(1) memoria y tiempo por muestra, sin guardar datos.
+    Las primeras EXACT_N muestras se guardan ordenadas (cuantil exacto, un baseline de 10 s a hop 1 s
+    tiene sólo 10 valores) y con ellas se inician los marcadores."""
+    __slots__ = ('p', 'q', 'n', 'want', 'dwant', 'count')
+    EXACT_N = 64
+
+    def __init__(self, p):
+        self.p = p
+        self.q = []                                   # muestras ordenadas y luego alturas de los marcadores
+        self.n = None                                 # posiciones actuales (None = aún en modo exacto)
+        self.want = None                              # posiciones deseadas
+        self.dwant = [0, p / 2, p, (1 + p) / 2, 1]
+        self.count = 0
+
+    def add(self, x):
+        self.count += 1
+        q, n = self.q, self.n
+        if n is None:
+            bisect.insort(q, x)
+            if len(q) > self.EXACT_N:
+                last = len(q) - 1
+                self.want = [last * f for f in self.dwant]
+                self.n = [int(round(w)) for w in self.want]
+                self.q = [q[i] for i in self.n]
+            return
+        if x < q[0]:
+            q[0] = x; k = 0
+        elif x >= q[4]:
+            q[4] = x; k = 3
+        else:
+            k = 0
+            while x >= q[k + 1]: k += 1
+        for i in range(k + 1, 5): n[i] += 1
+        for i in range(5): self.want[i] += self.dwant[i]
+        for i in (1, 2, 3):
+            d = self.want[i] - n[i]
+            if (d >= 1 and n[i + 1] - n[i] > 1) or (d <= -1 and n[i - 1] - n[i] < -1):
+                d = 1 if d > 0 else -1
+                qp = q[i] + d / (n[i + 1] - n[i - 1]) * ((n[i] - n[i - 1] + d) * (q[i + 1] - q[i]) / (n[i + 1] - n[i])
+                                                        + (n[i + 1] - n[i] - d) * (q[i] - q[i - 1]) / (n[i] - n[i - 1]))
+                if not q[i - 1] < qp < q[i + 1]:
+                    qp = q[i] + d * (q[i + d] - q[i]) / (n[i + d] - n[i])
+                q[i] = qp
+                n[i] += d
+
+    @property
+    def value(self):
+        if self.n is not None:
+            return self.q[2]
+        if not self.q:
+            return float('nan')
+        return float(np.quantile(self.q, self.p))
+
+class RobustStats(RunningStats):
+    """RunningStats + cuartiles P²: centro = mediana, dispersión = IQR/1.349 (≈ σ con datos normales,
+    como 1.4826·MAD). Un parpadeo o apretón de mandíbula mueve cada marcador a lo sumo una posición,
+    así que no infla σ como la varianza. O(1) por muestra y al cerrar el baseline."""
+    __slots__ = ('quartiles', 'extra')
+
+    def reset(self):
+        super().reset()
+        self.quartiles = (P2Quantile(0.25), P2Quantile(0.5), P2Quantile(0.75))
+        self.extra = None  # (n, centro, dispersión) agregado con merge(), p. ej. el perfil guardado
+
+    def add(self, x):
+        super().add(x)
+        for q in self.quartiles: q.add(x)
+
+    def merge(self, other):
+        """Los marcadores P² no se pueden fusionar: se combina centro/dispersión como mezcla ponderada"""
+        super().merge(other)
+        if other.count:
+            self.extra = mix_summaries(self.extra, (other.count, other.center, other.spread))
+        return self
+
+    def _own(self):
+        lo, med, hi = (q.value for q in self.quartiles)
+        return (self.quartiles[1].count, med, (hi - lo) / 1.349)
+
+    @property
+    def center(self):
+        return mix_summaries(self._own(), self.extra)[1]
+
+    @property
+    def spread(self):
+        return mix_summaries(self._own(), self.extra)[2]
+
+def mix_summaries(a, b):
+    """(n, centro, dispersión) de la mezcla de dos resúmenes (cualquiera puede ser None/vacío)"""
+    if not a or not a[0]: return b or a
+    if not b or not b[0]: return a
+    n = a[0] + b[0]
+    c = (a[0] * a[1] + b[0] * b[1]) / n
+    var = (a[0] * (a[2] ** 2 + (a[1] - c) ** 2) + b[0] * (b[2] ** 2 + (b[1] - c) ** 2)) / n
+    return (n, c, math.sqrt(var))
+
+def make_baseline_stats(band):
+    """Acumulador del baseline EEG de una banda: robusto (mediana/IQR) si se eligió en el menú"""
+    return RobustStats() if band in robust_bands else RunningStats()
+
 # Estructura para modo promedio (compatibilidad con v24)
-bands = {b: dict(rms=np.nan, env=0, signed_env=0.0, mu=MU_DEFAULTS.get(b, 1.0) if is_simulation else None, sd=SD_DEFAULTS.get(b, 1.0) if is_simulation else None, cc=0, buf=[]) for b in FILTS}
+bands = {b: dict(rms=np.nan, env=0, signed_env=0.0, mu=MU_DEFAULTS.get(b, 1.0) if is_simulation else None, sd=SD_DEFAULTS.get(b, 1.0) if is_simulation else None, cc=0, stats=make_baseline_stats(b)) for b in FILTS}
 
 # Estructura para modo multicanal (4 canales individuales del Muse 2)
 # Cada canal tiene sus propias bandas de frecuencia procesadas independientemente
 bands_per_channel = {
-    ch: {b: dict(rms=np.nan, env=0, signed_env=0.0, mu=None, sd=None, cc=0, buf=[]) for b in FILTS}
+    ch: {b: dict(rms=np.nan, env=0, signed_env=0.0, mu=None, sd=None, cc=0, stats=make_baseline_stats(b)) for b in FILTS}
     for ch in EEG_CHANNELS
 }
 
 acc = {'x':0.0, 'y':0.0, 'z':0.0}
 acc_baseline = {'x': 0.0, 'y': 0.0, 'z': 0.0}  # ← Posición neutral
-acc_rng = {a: dict(min=None, max=None, values=[]) for a in acc}  # ← values[] para capturar datos del baseline
+acc_rng = {a: dict(min=None, max=None, neutral=RunningStats(), movement=RunningStats()) for a in acc}  # ← estadísticas de cada fase del baseline
 
 # Rangos de baseline ACC para exportar a TouchDesigner (incluyendo desviación estándar)
 baseline_acc_x = {'neutral': None, 'min': None, 'max': None, 'range': None, 'sigma': None}
@@ -653,8 +1762,27 @@ jaw = dict(clenched=0, cc=0)  # Jaw clench detection
 # use_ppg, use_gyro, use_jaw se inicializan en línea 116 (antes del menú)
 
 # Buffer de EEG - un buffer por canal para modo multicanal
-eeg_buf = deque(maxlen=WIN)  # Modo promedio (compatibilidad)
-eeg_buf_per_channel = {ch: deque(maxlen=WIN) for ch in EEG_CHANNELS}  # Modo multicanal
+eeg_buf = RingBuffer(WIN)  # Modo promedio (compatibilidad)
+eeg_buf_channels = RingBuffer(WIN, n_channels=len(EEG_CHANNELS))  # Modo multicanal: (4, WIN)
+
+# Ingesta por bloques: el handler OSC sólo agrega la muestra a esta lista y cada
+# EEG_BLOCK_SIZE muestras se procesa el bloque completo con NumPy. Un bloque incompleto
+# no espera más de EEG_BLOCK_MAX_AGE (stream lento o cortado): lo vacía la siguiente
+# muestra, el bucle de recepción cuando está ocioso (flush_stale_eeg) o el cierre.
+# eeg_block_lock protege la lista y serializa el procesamiento si hay varios receptores.
+EEG_BLOCK_SIZE = 16
+EEG_BLOCK_MAX_AGE = HOP_S
+eeg_block_rows = []
+eeg_block_t0 = 0.0  # time.monotonic() de la primera muestra del bloque en curso
+eeg_block_lock = threading.RLock()
+
+# Motores de bandas (IIR con estado o espectral): uno para el promedio y uno 2-D para los 4 canales
+band_engine_avg = make_band_engine()
+band_engine_channels = make_band_engine(n_channels=len(EEG_CHANNELS))
+if use_eeg and not is_simulation:
+    print_latency_estimate()
+    if band_engine_mode != 'iir':
+        benchmark_band_engines()
 
 # --- Tracking de eventos de baseline para evitar envíos duplicados ---
 baseline_eeg_start_sent = False
@@ -814,101 +1942,176 @@ def line_post():
 
 # --- Handlers y Parse (Solo modo real) ---
 def muse_eeg(_, *vals):
-    """Handler EEG - Soporta modo promedio y multicanal (4 canales)
+    """Handler EEG - sólo acumula la muestra; el procesamiento es por bloques.
     Muse envía mensajes con:
     - 1 valor: modo promedio
     - 4 valores: [TP9, AF7, AF8, TP10]
     - 6 valores: [TP9, AF7, AF8, TP10, AUX_LEFT, AUX_RIGHT] - formato Muse 2
     """
     if not use_eeg or is_simulation: return
-    global frames_left, baseline_done, baseline_eeg_done
-    
-    if debug_mode and baseline_done and len(vals) > 0:
-        print(f"[EEG DEBUG] Recibido {len(vals)} valores, modo: {eeg_processing_mode}")
-    
-    if len(vals) == 0:
+    queue_eeg_row(vals)
+
+def muse_eeg_array(vals):
+    """Handler EEG de la ruta rápida (FastOSCReceiver): vals ya es un arreglo float"""
+    if not use_eeg or is_simulation: return
+    queue_eeg_row(vals)
+
+def queue_eeg_row(vals):
+    """Agrega una muestra al bloque en curso y lo procesa si está lleno o es viejo"""
+    global eeg_block_t0
+    with eeg_block_lock:
+        now = time.monotonic()
+        if not eeg_block_rows:
+            eeg_block_t0 = now
+        eeg_block_rows.append(vals)
+        if len(eeg_block_rows) >= EEG_BLOCK_SIZE or now - eeg_block_t0 >= EEG_BLOCK_MAX_AGE:
+            flush_eeg_block()
+
+def flush_stale_eeg():
+    """Procesa el bloque incompleto si lleva más de EEG_BLOCK_MAX_AGE esperando (bucle ocioso)"""
+    if eeg_block_rows and time.monotonic() - eeg_block_t0 >= EEG_BLOCK_MAX_AGE:
+        flush_eeg_block()
+
+def flush_eeg_block():
+    """Convierte las muestras acumuladas en un bloque (n, n_vals) y lo procesa"""
+    global eeg_block_rows
+    with eeg_block_lock:
+        rows, eeg_block_rows = eeg_block_rows, []
+        if not rows:
+            return
+        width = len(rows[0])
+        if any(len(r) != width for r in rows):
+            # Cambio de formato dentro del bloque: procesar cada formato por separado
+            for r in rows:
+                block = np.array([[np.nan if v is None else v for v in r]], dtype=float)
+                if raw_recorder is not None: raw_recorder.append_eeg(block)
+                process_eeg_block(block)
+            return
+        try:
+            block = np.array(rows, dtype=float)
+        except (TypeError, ValueError):
+            block = np.array([[np.nan if v is None else v for v in r] for r in rows], dtype=float)
+        if raw_recorder is not None: raw_recorder.append_eeg(block)
+        process_eeg_block(block)
+
+def feed_ring(ring, samples, on_hop):
+    """Agrega samples (n_channels, n) al RingBuffer cortando el bloque justo en cada
+    hop (ventana completa + STEP muestras nuevas) y llamando on_hop() en cada uno"""
+    n = samples.shape[-1]
+    i = 0
+    while i < n:
+        take = min(n - i, max(1, WIN - ring.count, STEP - ring.pending))
+        ring.append(samples[..., i:i + take])
+        i += take
+        if ring.count >= WIN and ring.pending >= STEP:
+            on_hop()
+
+def process_eeg_block(block):
+    """Procesa un bloque de muestras EEG (n, n_vals) - modo promedio y multicanal"""
+    if debug_mode and baseline_done:
+        print(f"[EEG DEBUG] Bloque {block.shape[0]}x{block.shape[1]} valores, modo: {eeg_processing_mode}")
+    
+    if block.shape[1] == 0:
         if baseline_done:
             print(f"[EEG] ⚠️ Sin datos recibidos")
         return
     
+    # El bloque se corta en los hops del anillo promedio y cada tramo pasa por ambos anillos
+    # (canales + promedio) dentro de UN tick: todo lo que produce un hop sale en el mismo bundle
+    n = block.shape[0]
+    i = 0
+    while i < n:
+        take = min(n - i, max(1, WIN - eeg_buf.count, STEP - eeg_buf.pending))
+        with osc_bundle_tick():
+            process_eeg_rows(block[i:i + take])
+        i += take
+
+def process_eeg_rows(block):
+    """Alimenta los anillos multicanal y promedio con un tramo de process_eeg_block()"""
+    nan_mask = np.isnan(block)
+    
     # Detectar si tenemos datos multicanal: 4 o 6 valores
-    if (len(vals) == 4 or len(vals) == 6) and eeg_processing_mode == 'individual':
-        # Procesar multicanal: usar los primeros 4 valores (canales principales)
-        process_eeg_multichannel(vals[:4])  # TP9, AF7, AF8, TP10
+    if block.shape[1] in (4, 6) and eeg_processing_mode == 'individual':
+        # Usar los primeros 4 valores (TP9, AF7, AF8, TP10); si algún canal trae NaN se
+        # descarta la muestra completa para mantener los 4 canales alineados en el buffer
+        channels = block[:, :4][~nan_mask[:, :4].any(axis=1)]
+        if channels.size:
+            feed_ring(eeg_buf_channels, channels.T, process_eeg_multichannel)
     
     # Siempre procesar también el promedio (compatible con v24)
     # para evitar duplicar lógica y permitir envío de datos en todos los modos
-    valid_vals = [v for v in vals if not (v is None or (isinstance(v, float) and math.isnan(v)))]
-    if not valid_vals:
+    valid_rows = ~nan_mask.all(axis=1)
+    if not valid_rows.any():
         if baseline_done:
             print(f"[EEG] ⚠️ Todos los valores son NaN")
         return
-    mean_val = float(np.mean(valid_vals))
-    eeg_buf.append(mean_val)
-    process_eeg_average()
-
-def process_eeg_multichannel(vals):
-    """Procesa 4 canales EEG individuales del Muse 2
-    vals = [tp9_sample, af7_sample, af8_sample, tp10_sample]
-    Cada llamada agrega UNA muestra por canal
+    means = np.nanmean(block[valid_rows], axis=1)
+    feed_ring(eeg_buf, means, process_eeg_average)
+
+def multichannel_band_rms(ring):
+    """Consume el RingBuffer (n_canales, WIN) -> matriz RMS (n_canales, n_bandas)
+    de la última ventana. Con IIR cada banda se filtra con UNA llamada sobre el eje
+    de tiempo para todos los canales; con FFT/Welch es una rfft por canal."""
+    return band_engine_channels.process_ring(ring).T
+
+def process_eeg_multichannel():
+    """Procesa 4 canales EEG individuales del Muse 2 (TP9, AF7, AF8, TP10)
+    desde eeg_buf_channels; se llama en cada hop desde feed_ring()
     """
     global frames_left, baseline_done, baseline_eeg_done, baseline_eeg_start_sent
     
-    if len(vals) != 4:
-        print(f"⚠️ Esperaba 4 valores, recibí {len(vals)}")
-        return
-    
-    # Agregar un sample por canal
-    for idx, ch_name in enumerate(EEG_CHANNELS):
-        sample_val = vals[idx]
-        if sample_val is not None and not (isinstance(sample_val, float) and math.isnan(sample_val)):
-            eeg_buf_per_channel[ch_name].append(float(sample_val))
-    
-    # Verificar si tenemos suficientes muestras (WIN samples)
-    all_ready = all(len(eeg_buf_per_channel[ch]) >= WIN for ch in EEG_CHANNELS)
-    if not all_ready:
+    # Verificar si tenemos ventana completa y un hop (STEP) de muestras nuevas
+    if eeg_buf_channels.count < WIN or eeg_buf_channels.pending < STEP:
         return  # Seguir acumulando samples
     
-    # Procesar cada canal con ventana completa
+    # Muestras nuevas (4, n) -> matriz RMS (4, 5) en una pasada por banda
     channel_results = {}
-    for ch_name in EEG_CHANNELS:
-        seg = np.array(eeg_buf_per_channel[ch_name])
-        ch_env = []
-        ch_signed = []
-        ch_raw = []
-        
-        try:
-            for band_name, filt in FILTS.items():
-                r = band_rms(seg, filt)
-                bands_per_channel[ch_name][band_name]['rms'] = r
-                ch_raw.append(float(r) if (r is not None and not math.isnan(r)) else float('nan'))
+    try:
+        rms_matrix = multichannel_band_rms(eeg_buf_channels)
+    except Exception as e:
+        print(f"Error procesando canales: {e}")
+        rms_matrix = None
+    
+    if rms_matrix is not None:
+        for ch_idx, ch_name in enumerate(EEG_CHANNELS):
+            ch_env = []
+            ch_signed = []
+            ch_raw = []
+            for band_idx, band_name in enumerate(FILTS):
+                r = float(rms_matrix[ch_idx, band_idx])
+                band_state = bands_per_channel[ch_name][band_name]
+                band_state['rms'] = r
+                ch_raw.append(r)
                 
                 if not baseline_done:
-                    if r is not None and not math.isnan(r):
-                        bands_per_channel[ch_name][band_name]['buf'].append(r)
+                    if not math.isnan(r):
+                        band_state['stats'].add(r)
                 else:
-                    mu = bands_per_channel[ch_name][band_name]['mu']
-                    sd = bands_per_channel[ch_name][band_name]['sd']
+                    mu = band_state['mu']
+                    sd = band_state['sd']
                     if mu is None or sd is None: continue
                     
-                    prev_signed = bands_per_channel[ch_name][band_name]['signed_env']
-                    if sd <= 1e-9 or r is None or math.isnan(r):
+                    if recal_eeg_frames and not math.isnan(r):
+                        band_state['stats'].add(r)  # baseline sombra (recalibración en curso)
+                    
+                    prev_signed = band_state['signed_env']
+                    if sd <= 1e-9 or math.isnan(r):
                         signed_z = 0.0
                     else:
                         signed_z = (r - mu) / sd
+                    if adaptive_baseline and not math.isnan(r):
+                        adapt_baseline(band_state, r)
                     
-                    current_signed = ALPHA_ENV * signed_z + (1 - ALPHA_ENV) * prev_signed
-                    bands_per_channel[ch_name][band_name]['signed_env'] = current_signed
+                    current_signed = ALPHA_ENV_EEG * signed_z + (1 - ALPHA_ENV_EEG) * prev_signed
+                    band_state['signed_env'] = current_signed
                     current_env = abs(current_signed)
-                    bands_per_channel[ch_name][band_name]['env'] = current_env
-                    bands_per_channel[ch_name][band_name]['cc'] = scale(current_env, 0, Z_MAX)
+                    band_state['env'] = current_env
+                    band_state['cc'] = scale(current_env, 0, Z_MAX)
                     
                     ch_env.append(current_env)
                     ch_signed.append(current_signed)
             
             channel_results[ch_name] = {'env': ch_env, 'signed': ch_signed, 'raw': ch_raw}
-        except Exception as e:
-            print(f"Error procesando canal {ch_name}: {e}")
     
     # Enviar datos multicanal
     if baseline_done:
@@ -924,49 +2127,47 @@ def process_eeg_multichannel(vals):
         except Exception as e:
             print(f"Error enviando OSC multicanal: {e}")
     
-    # Baseline
-    if not baseline_done:
-        complete_baseline_phase()
-    
-    # Limpiar buffers
-    if STEP > 0:
-        for ch_name in EEG_CHANNELS:
-            for _ in range(min(STEP, len(eeg_buf_per_channel[ch_name]))):
-                if eeg_buf_per_channel[ch_name]:
-                    eeg_buf_per_channel[ch_name].popleft()
+    # El contador del baseline lo avanza process_eeg_average(), que corre en ambos modos en el
+    # mismo tick: llamarlo también aquí descontaba dos frames por hop en modo individual
+
 
 def process_eeg_average():
     """Procesa EEG en modo promedio (v24 compatible)"""
     global frames_left, baseline_done, baseline_eeg_done, baseline_eeg_start_sent
     
-    if len(eeg_buf) < WIN:
+    if eeg_buf.count < WIN or eeg_buf.pending < STEP:
         return
     
-    seg = np.array(eeg_buf)
     osc_band_values_env = []
     osc_band_values_signed = []
     osc_band_values_raw = []
     
     try:
-        for n, f in FILTS.items():
-            r = band_rms(seg, f)
+        # IIR: primer hop ventana completa, luego sólo las STEP muestras nuevas (vista sin copia)
+        rms_bands = band_engine_avg.process_ring(eeg_buf)[:, 0]
+        for n, r in zip(band_engine_avg.names, rms_bands):
+            r = float(r)
             bands[n]['rms'] = r
             # guardar raw (si es numérico) para salida
             osc_band_values_raw.append(float(r) if (r is not None and not math.isnan(r)) else float('nan'))
             if not baseline_done:
-                 if r is not None and not math.isnan(r): bands[n]['buf'].append(r)
+                 if r is not None and not math.isnan(r): bands[n]['stats'].add(r)
             else:
                 if bands[n]['mu'] is None or bands[n]['sd'] is None: continue
                 # Calcular z-score (signed) y usar el mismo valor suavizado para signed y env
                 mu = bands[n]['mu']; sd = bands[n]['sd']; prev_signed_env = bands[n]['signed_env']
+                if recal_eeg_frames and r is not None and not math.isnan(r):
+                    bands[n]['stats'].add(r)  # baseline sombra (recalibración en curso)
                 eps = 1e-9
                 if sd is None or sd <= eps or r is None or (isinstance(r, float) and math.isnan(r)):
                     signed_z_raw = 0.0
                 else:
                     signed_z_raw = (r - mu) / sd
+                if adaptive_baseline and not math.isnan(r):
+                    adapt_baseline(bands[n], r)
 
                 # Suavizar el z-score (misma alpha para signed y luego env = abs(signed))
-                current_signed = ALPHA_ENV * signed_z_raw + (1 - ALPHA_ENV) * prev_signed_env
+                current_signed = ALPHA_ENV_EEG * signed_z_raw + (1 - ALPHA_ENV_EEG) * prev_signed_env
                 bands[n]['signed_env'] = current_signed
 
                 # Env debe ser la magnitud absoluta del signed suavizado (misma magnitud)
@@ -997,6 +2198,10 @@ def process_eeg_average():
                 send_proc("/py/bands_raw", raw_3)
         except Exception as e:
             print(f"!!! Error enviando OSC continuo: {e}")
+        if adaptive_baseline:
+            send_adaptive_baseline()
+        if recal_eeg_frames:
+            recal_eeg_step()
     if not baseline_done and use_eeg:
         complete_baseline_phase()
 
@@ -1007,25 +2212,95 @@ def process_eeg_average():
         refresh(line_pre())
     else:
         refresh(line_post())
-    if STEP > 0:
-        for _ in range(STEP):
-            if eeg_buf:
-                eeg_buf.popleft()
+
+def adapt_baseline(state, r):
+    """Baseline adaptativo: acerca mu/sd de una banda (promedio o canal) a la ventana actual con
+    media y varianza exponenciales, O(1) por hop. La innovación se recorta a ±Z_MAX σ para que un
+    parpadeo o un apretón de mandíbula no arrastren el baseline. Una banda sin baseline real
+    (σ=1e-9, "SIN DATOS") no se adapta: sin σ no hay recorte y cualquier artefacto la movería."""
+    mu, sd = state['mu'], state['sd']
+    if sd <= 1e-9:
+        return
+    d = max(-Z_MAX * sd, min(Z_MAX * sd, r - mu))
+    state['mu'] = mu + ADAPT_ALPHA * d
+    state['sd'] = max(1e-9, math.sqrt((1 - ADAPT_ALPHA) * (sd * sd + ADAPT_ALPHA * d * d)))
+
+last_adaptive_send = 0.0
+def send_adaptive_baseline():
+    """Envía el baseline adaptado a TouchDesigner cada ADAPT_SEND_SEC (no por hop)"""
+    global last_adaptive_send
+    now = clock_time()
+    if now - last_adaptive_send < ADAPT_SEND_SEC:
+        return
+    last_adaptive_send = now
+    if all(bands[n]['mu'] is not None for n in FILTS):
+        send_proc("/py/baseline_mu", [float(bands[n]['mu']) for n in FILTS])
+        send_proc("/py/baseline_sigma", [float(bands[n]['sd']) for n in FILTS])
+    if eeg_processing_mode == 'individual':
+        for ch_name in EEG_CHANNELS:
+            ch = bands_per_channel[ch_name]
+            if all(ch[n]['mu'] is not None for n in FILTS):
+                send_proc(f"/py/{ch_name.lower()}/baseline_mu", [float(ch[n]['mu']) for n in FILTS])
+
+def stats_baseline(st):
+    """(μ, σ, min, max) de un acumulador de baseline, o None si no tiene muestras"""
+    if not st.count: return None
+    return st.center, (st.spread if st.count > 1 else 1e-9), st.min, st.max
+
+def recal_eeg_step():
+    """Un hop del baseline EEG sombra (se llama desde process_eeg_average, después de enviar)"""
+    global recal_eeg_frames
+    recal_eeg_frames -= 1
+    total_frames = int(BASE_SEC / (STEP / SRATE))
+    send_baseline_event("eeg", "progress", max(0, int((total_frames - recal_eeg_frames) / max(1, total_frames) * 100)))
+    if recal_eeg_frames <= 0:
+        swap_eeg_baseline()
+
+def swap_eeg_baseline():
+    """Reemplaza μ/σ de todas las bandas (o de todos los canales en modo individual) por el baseline
+    sombra. Primero se calcula todo y luego se asigna en el mismo hop del hilo de procesamiento: ningún
+    envío mezcla baseline viejo y nuevo. Una banda sin muestras conserva su baseline anterior."""
+    if eeg_processing_mode == 'individual':
+        groups = {ch: (bands_per_channel[ch], baseline_eeg_values_per_channel[ch]) for ch in EEG_CHANNELS}
+    else:
+        groups = {None: (bands, baseline_eeg_values)}
+    new = {g: {n: stats_baseline(states[n]['stats']) for n in FILTS} for g, (states, _) in groups.items()}
+    for g, (states, values) in groups.items():
+        for n, b in new[g].items():
+            if b is not None:
+                states[n]['mu'], states[n]['sd'] = b[0], b[1]
+                values[n] = dict(zip(('mu', 'sigma', 'min', 'max'), b))
+            states[n]['stats'].reset()
+    
+    print("\n✨ Nuevo baseline EEG aplicado:")
+    for g, vals in new.items():
+        if g: print(f"📡 Canal {g}:")
+        for n, b in vals.items():
+            if b is None: print(f"  ⚠️ {n:8s}: SIN DATOS - se mantiene el baseline anterior")
+            else: print(f"  ✓ {n:8s}: μ={b[0]:7.3f} σ={b[1]:7.3f} [{b[2]:7.3f}, {b[3]:7.3f}]{' (robusto)' if n in robust_bands else ''}")
+    if eeg_processing_mode == 'individual':
+        send_channel_baseline()
+    elif all(n in baseline_eeg_values for n in FILTS):
+        for stat, path in (('mu', 'baseline_mu'), ('sigma', 'baseline_sigma'), ('min', 'baseline_min'), ('max', 'baseline_max')):
+            send_proc(f"/py/{path}", [float(baseline_eeg_values[n][stat]) for n in FILTS], force=True)
+    send_baseline_event("eeg", "end")
+    if not use_acc:
+        save_baseline_profile()
 
 def complete_baseline_phase():
     """Completa la fase de baseline EEG (común para ambos modos)"""
-    global frames_left, baseline_done, baseline_eeg_done, baseline_eeg_start_sent
+    global frames_left, baseline_done, baseline_eeg_done, baseline_eeg_start_sent, baseline_prior, eeg_phase_sec
     
     if not baseline_eeg_start_sent:
-        send_baseline_event("eeg", "start", BASE_SEC)
+        send_baseline_event("eeg", "start", eeg_phase_sec)
         baseline_eeg_start_sent = True
     
     frames_left -= 1
-    total_frames = int(BASE_SEC / (STEP / SRATE))
+    total_frames = int(eeg_phase_sec / (STEP / SRATE))
     frames_done = total_frames - frames_left
     progress_pct = max(0, int((frames_done / max(1, total_frames)) * 100))
     progress_bar = "█" * (progress_pct // 5) + "░" * (20 - progress_pct // 5)
-    tiempo_restante = max(0, BASE_SEC - (frames_done * STEP / SRATE))
+    tiempo_restante = max(0, eeg_phase_sec - (frames_done * STEP / SRATE))
     
     send_baseline_event("eeg", "progress", progress_pct)
     sys.stdout.write(f"\r[BASELINE] {progress_bar} {progress_pct:3d}% | ⏱️  {tiempo_restante:5.1f}s restantes")
@@ -1040,43 +2315,43 @@ def complete_baseline_phase():
             for ch_name in EEG_CHANNELS:
                 print(f"📡 Canal {ch_name}:")
                 for band_name in FILTS:
-                    arr = np.array(bands_per_channel[ch_name][band_name]['buf'])
-                    if arr.size > 0:
-                        mu_val = arr.mean()
-                        sd_val = arr.std() if arr.size > 1 else 1e-9
-                        min_val = float(np.min(arr))
-                        max_val = float(np.max(arr))
+                    st = bands_per_channel[ch_name][band_name]['stats']
+                    merge_profile_prior(st, baseline_prior.get('channels', {}).get(ch_name, {}).get(band_name))
+                    base = stats_baseline(st)
+                    if base:
+                        mu_val, sd_val, min_val, max_val = base
                         bands_per_channel[ch_name][band_name]['mu'] = mu_val
                         bands_per_channel[ch_name][band_name]['sd'] = sd_val
                         baseline_eeg_values_per_channel[ch_name][band_name] = {
                             'mu': mu_val, 'sigma': sd_val, 'min': min_val, 'max': max_val
                         }
-                        print(f"  ✓ {band_name:6s}: μ={mu_val:6.3f} σ={sd_val:6.3f} [{min_val:6.3f}, {max_val:6.3f}]")
-                        bands_per_channel[ch_name][band_name]['buf'] = []
+                        print(f"  ✓ {band_name:6s}: μ={mu_val:6.3f} σ={sd_val:6.3f} [{min_val:6.3f}, {max_val:6.3f}]{' (robusto)' if band_name in robust_bands else ''}")
                     else:
                         bands_per_channel[ch_name][band_name]['mu'] = 1.0
                         bands_per_channel[ch_name][band_name]['sd'] = 1e-9
+                    st.reset()
                 print()
             print("✅ ¡Baseline MULTICANAL completado!")
+            send_channel_baseline()
         else:
             # Baseline promedio
             baseline_mu_values = []
             all_bands_valid = True
             for n in bands:
-                arr = np.array(bands[n]['buf'])
-                if arr.size > 0:
-                    bands[n]['mu'] = mu_val = arr.mean()
-                    bands[n]['sd'] = sd_val = arr.std() if arr.size > 1 else 1e-9
-                    min_val = float(np.min(arr))
-                    max_val = float(np.max(arr))
+                st = bands[n]['stats']
+                merge_profile_prior(st, baseline_prior.get('average', {}).get(n))
+                base = stats_baseline(st)
+                if base:
+                    mu_val, sd_val, min_val, max_val = base
+                    bands[n]['mu'], bands[n]['sd'] = mu_val, sd_val
                     baseline_eeg_values[n] = {'mu': mu_val, 'sigma': sd_val, 'min': min_val, 'max': max_val}
-                    print(f"  ✓ {n:8s}: μ={mu_val:7.3f} σ={sd_val:7.3f} [{min_val:7.3f}, {max_val:7.3f}]")
+                    print(f"  ✓ {n:8s}: μ={mu_val:7.3f} σ={sd_val:7.3f} [{min_val:7.3f}, {max_val:7.3f}]{' (robusto)' if n in robust_bands else ''}")
                 else:
                     bands[n]['mu'] = mu_val = 1.0
                     bands[n]['sd'] = 1e-9
                     baseline_eeg_values[n] = {'mu': 1.0, 'sigma': 1e-9, 'min': 1.0, 'max': 1.0}
                     all_bands_valid = False
-                bands[n]['buf'] = []
+                st.reset()
                 baseline_mu_values.append(mu_val)
             
             if all_bands_valid:
@@ -1088,16 +2363,31 @@ def complete_baseline_phase():
         baseline_eeg_start_sent = False
         baseline_eeg_done = True
         baseline_done = True
+        baseline_prior = {}
+        eeg_phase_sec = BASE_SEC
+        if baseline_acc_done:
+            save_baseline_profile()
         
-        if use_acc:
+        if use_acc and not baseline_acc_done:
             print(f"\n🔄 Iniciando FASE ACC: Posición Neutra ({baseline_acc_neutral_duration}s)...")
             print("   ⚠️ MANTÉN CABEZA EN POSICIÓN NEUTRAL\n")
 
+def send_channel_baseline():
+    """Envía μ/σ de cada canal (modo individual) a TouchDesigner"""
+    for ch_name in EEG_CHANNELS:
+        vals = baseline_eeg_values_per_channel[ch_name]
+        if all(n in vals for n in FILTS):
+            send_proc(f"/py/{ch_name.lower()}/baseline_mu", [float(vals[n]['mu']) for n in FILTS], force=True)
+            send_proc(f"/py/{ch_name.lower()}/baseline_sigma", [float(vals[n]['sigma']) for n in FILTS], force=True)
+
 def muse_acc(_, x, y, z):
     if not use_acc or is_simulation: return
     global frames_left_acc_neutral, frames_left_acc_movement, baseline_acc_neutral_done, baseline_acc_movement_done, baseline_acc_done, baseline_eeg_done, baseline_done
     global acc_neutral_start_time, acc_movement_start_time
     
+    # Grabación cruda: todas las muestras, también durante el baseline EEG
+    if raw_recorder is not None and None not in (x, y, z): raw_recorder.append_acc(x, y, z)
+    
     # Si hay EEG, ignorar ACC durante baseline EEG
     if use_eeg and not baseline_eeg_done:
         return
@@ -1114,11 +2404,11 @@ def muse_acc(_, x, y, z):
     
     acc.update(x=x, y=y, z=z)
     try:
-        send_proc("/py/acc", [x, y, z])
+        send_sensor("/py/acc", [x, y, z])
     except Exception:
         pass
     
-    current_time = time.time()
+    current_time = clock_time()
     
     # FASE A: POSICIÓN NEUTRA (5 segundos)
     if not baseline_acc_neutral_done:
@@ -1135,12 +2425,8 @@ def muse_acc(_, x, y, z):
         elapsed = current_time - acc_neutral_start_time
         
         for a in acc:
-            rng = acc_rng[a]
-            # Guardar valores para calcular desviación estándar después
-            rng['values'].append(acc[a])
-            # Guardar min/max para posición neutral
-            rng['neutral_min'] = acc[a] if rng.get('neutral_min') is None else min(rng.get('neutral_min'), acc[a])
-            rng['neutral_max'] = acc[a] if rng.get('neutral_max') is None else max(rng.get('neutral_max'), acc[a])
+            # Estadísticas de la posición neutral (min/max/σ, sin guardar las muestras)
+            acc_rng[a]['neutral'].add(acc[a])
         
         # Mostrar progreso NEUTRAL (basado en tiempo real)
         progress_pct = max(0, min(100, int((elapsed / baseline_acc_neutral_duration) * 100)))
@@ -1150,8 +2436,9 @@ def muse_acc(_, x, y, z):
         # Enviar progreso
         send_baseline_event("acc_neutral", "progress", progress_pct)
         
-        sys.stdout.write(f"\r[NEUTRAL] {progress_bar} {progress_pct:3d}% | ⏱️  {tiempo_restante:5.1f}s")
-        sys.stdout.flush()
+        if virtual_now is None:  # en batch sería una escritura por muestra ACC
+            sys.stdout.write(f"\r[NEUTRAL] {progress_bar} {progress_pct:3d}% | ⏱️  {tiempo_restante:5.1f}s")
+            sys.stdout.flush()
         
         if elapsed >= baseline_acc_neutral_duration:
             # Enviar evento de término
@@ -1182,11 +2469,9 @@ def muse_acc(_, x, y, z):
         
         for a in acc:
             rng = acc_rng[a]
-            # Guardar valores para calcular desviación estándar después
-            rng['values'].append(acc[a])
-            # Guardar min/max para rango de movimiento
-            rng['min'] = acc[a] if rng['min'] is None else min(rng['min'], acc[a])
-            rng['max'] = acc[a] if rng['max'] is None else max(rng['max'], acc[a])
+            # Estadísticas del rango de movimiento; min/max visibles en vivo para el monitor
+            rng['movement'].add(acc[a])
+            rng['min'], rng['max'] = rng['movement'].min, rng['movement'].max
         
         # Mostrar progreso MOVIMIENTO (basado en tiempo real)
         progress_pct = max(0, min(100, int((elapsed / baseline_acc_movement_duration) * 100)))
@@ -1196,8 +2481,9 @@ def muse_acc(_, x, y, z):
         # Enviar progreso
         send_baseline_event("acc_movement", "progress", progress_pct)
         
-        sys.stdout.write(f"\r[MOVIMIENTO] {progress_bar} {progress_pct:3d}% | ⏱️  {tiempo_restante:5.1f}s")
-        sys.stdout.flush()
+        if virtual_now is None:
+            sys.stdout.write(f"\r[MOVIMIENTO] {progress_bar} {progress_pct:3d}% | ⏱️  {tiempo_restante:5.1f}s")
+            sys.stdout.flush()
         
         if elapsed >= baseline_acc_movement_duration:
             # Enviar evento de término
@@ -1209,17 +2495,33 @@ def muse_acc(_, x, y, z):
     
     # FASE C: OPERACIÓN NORMAL - Medir desviación respecto a baseline
     else:
+        base = acc_baseline  # Ctrl+B lo reemplaza entero desde otro hilo
         for a in acc:
-            baseline_val = acc_baseline.get(a, 0.0)
+            baseline_val = base.get(a, 0.0)
             deviation = acc[a] - baseline_val
             v = scale(abs(deviation), 0, 0.5)  # Rango de movimiento típico
             set_cc('acc'+a, v)
             try:
-                send_proc(f"/py/acc_{a}_deviation", float(deviation))
+                send_sensor(f"/py/acc_{a}_deviation", float(deviation))
             except Exception:
                 pass
+        if recal_acc_phase:
+            recal_acc_sample(current_time)
         # Nota: refresh() no se llama desde handlers OSC para evitar threading issues
 
+def recal_acc_sample(now):
+    """Baseline ACC sombra: el handler sólo acumula la muestra en la fase actual; el hilo de
+    recalibración mide la duración, envía los eventos y cierra las fases."""
+    global recal_acc_t0, recal_acc_last
+    phase = recal_acc_phase
+    if phase is None:
+        return
+    for a in acc:
+        acc_rng[a][phase].add(acc[a])
+    if recal_acc_t0 is None:
+        recal_acc_t0 = now
+    recal_acc_last = now
+
 
 def muse_ppg(_, *args):
     """Recibe PPG (photoplethysmography) - heartbeat desde Muse
@@ -1228,6 +2530,7 @@ def muse_ppg(_, *args):
     Estrategia: usar la variación relativa (derivada) como indicador de BPM
     """
     if not use_ppg or is_simulation: return
+    if raw_recorder is not None: raw_recorder.append_ppg(args)
     
     # Muse envía 3 valores, el útil es el segundo (índice 1)
     if len(args) < 2:
@@ -1277,7 +2580,7 @@ def muse_ppg(_, *args):
         ppg['bpm'] = float(bpm)
         
         try:
-            send_proc("/py/ppg/bpm", float(bpm))
+            send_sensor("/py/ppg/bpm", float(bpm))
         except BlockingIOError:
             pass  # Socket no-bloqueante saturado
         except Exception:
@@ -1295,7 +2598,7 @@ def muse_ppg(_, *args):
     
     try:
         # Enviar valor raw también
-        send_proc("/py/ppg", ppg_value_float)
+        send_sensor("/py/ppg", ppg_value_float)
     except BlockingIOError:
         pass
     except Exception:
@@ -1314,7 +2617,7 @@ def muse_gyro(_, x, y, z):
     gyro.update(x=float(x), y=float(y), z=float(z))
     
     try:
-        send_proc("/py/gyro", [float(x), float(y), float(z)])
+        send_sensor("/py/gyro", [float(x), float(y), float(z)])
     except Exception:
         pass
     
@@ -1433,24 +2736,22 @@ def close_baseline_eeg():
     all_bands_valid = True
     
     for n in bands:
-        arr = np.array(bands[n]['buf'])
-        if arr.size > 0:
-            mu_val = arr.mean()
-            sd_val = arr.std() if arr.size > 1 else 1e-9
-            min_val = float(np.min(arr))
-            max_val = float(np.max(arr))
+        st = bands[n]['stats']
+        base = stats_baseline(st)
+        if base:
+            mu_val, sd_val, min_val, max_val = base
             bands[n]['mu'] = mu_val
             bands[n]['sd'] = sd_val
             # Guardar en variable global para CSV y TouchDesigner
             baseline_eeg_values[n] = {'mu': mu_val, 'sigma': sd_val, 'min': min_val, 'max': max_val}
-            print(f"  ✓ {n:8s}: μ={mu_val:7.3f} σ={sd_val:7.3f} min={min_val:7.3f} max={max_val:7.3f} ({arr.size:4d} muestras)")
+            print(f"  ✓ {n:8s}: μ={mu_val:7.3f} σ={sd_val:7.3f} min={min_val:7.3f} max={max_val:7.3f} ({st.count:4d} muestras)")
         else:
             print(f"  ⚠️ {n:8s}: SIN DATOS - usando valores por defecto")
             bands[n]['mu'] = 1.0
             bands[n]['sd'] = 1e-9
             baseline_eeg_values[n] = {'mu': 1.0, 'sigma': 1e-9, 'min': 1.0, 'max': 1.0}
             all_bands_valid = False
-        bands[n]['buf'] = []
+        st.reset()
         baseline_mu_values.append(bands[n]['mu'])
     
     if all_bands_valid:
@@ -1494,28 +2795,28 @@ def close_baseline_acc():
     """Termina fases ACC (neutral + movimiento), comienza operación"""
     if is_simulation: return
     global baseline_acc_movement_done, baseline_acc_done
-    global baseline_acc_x, baseline_acc_y, baseline_acc_z
+    global baseline_acc_x, baseline_acc_y, baseline_acc_z, acc_baseline
     
     sys.stdout.write("\n")  # Nueva línea para separar
     print("\n✨ Calculando posición neutral, rango de movimiento y desviación estándar ACC...\n")
     
     # Calcular posición neutral como promedio de la FASE A (neutral)
+    new_baseline = {}
     for a in acc:
         rng = acc_rng[a]
         
-        # Posición neutral: promedio de lo capturado en FASE A
-        if rng.get('neutral_min') is not None and rng.get('neutral_max') is not None:
-            neutral_pos = (rng['neutral_min'] + rng['neutral_max']) / 2.0
-            acc_baseline[a] = neutral_pos
+        # Posición neutral: centro del rango capturado en FASE A
+        if rng['neutral'].count:
+            neutral_pos = (rng['neutral'].min + rng['neutral'].max) / 2.0
+            new_baseline[a] = neutral_pos
             
             # Rango de movimiento: diferencia max-min de FASE B
             movement_range = rng['max'] - rng['min'] if (rng['min'] is not None and rng['max'] is not None) else 1.0
             movement_range = max(movement_range, 0.01)  # Evitar división por cero
             
-            # Calcular desviación estándar de todos los valores capturados
-            sigma = 0.0
-            if rng.get('values') and len(rng['values']) > 1:
-                sigma = float(np.std(rng['values']))
+            # Desviación estándar de todos los valores capturados (ambas fases)
+            both = RunningStats().merge(rng['neutral']).merge(rng['movement'])
+            sigma = both.std if both.count > 1 else 0.0
             
             print(f"  ✓ {a}: neutral={neutral_pos:+.4f} | rango=[{rng['min']:+.4f}, {rng['max']:+.4f}] (Δ={movement_range:.4f}) σ={sigma:.4f}")
             
@@ -1527,7 +2828,7 @@ def close_baseline_acc():
             elif a == 'z':
                 baseline_acc_z = {'neutral': neutral_pos, 'min': rng['min'], 'max': rng['max'], 'range': movement_range, 'sigma': sigma}
         else:
-            acc_baseline[a] = 0.0
+            new_baseline[a] = 0.0
             print(f"  ⚠️ {a}: SIN DATOS - usando 0.0 como baseline")
             if a == 'x':
                 baseline_acc_x = {'neutral': 0.0, 'min': 0.0, 'max': 0.0, 'range': 0.0, 'sigma': 0.0}
@@ -1536,11 +2837,16 @@ def close_baseline_acc():
             elif a == 'z':
                 baseline_acc_z = {'neutral': 0.0, 'min': 0.0, 'max': 0.0, 'range': 0.0, 'sigma': 0.0}
     
+    acc_baseline = new_baseline  # un solo cambio: la FASE C nunca mezcla ejes viejos y nuevos
     baseline_acc_movement_done = True
     baseline_acc_done = True
     print("\n✅ Sistema COMPLETAMENTE CALIBRADO - Operación normal iniciada (env y raw en envío continuo).")
-    
-    # Enviar baseline ACC a TouchDesigner
+    send_acc_baseline()
+    if baseline_eeg_done:
+        save_baseline_profile()
+
+def send_acc_baseline():
+    """Enviar baseline ACC a TouchDesigner"""
     try:
         send_proc("/py/acc_x_neutral", baseline_acc_x['neutral'] if baseline_acc_x else 0.0, force=True)
         send_proc("/py/acc_x_range", baseline_acc_x['range'] if baseline_acc_x else 0.0, force=True)
@@ -1606,6 +2912,103 @@ def close_dist():
         print(f"Baseline Dist: min={dist['min']:.1f}, max={dist['max']:.1f}")
     dist_done = True
     print("✅ Baseline Distancia completado")
+
+# --- Perfiles de baseline por participante ---
+baseline_prior = {}  # Baseline EEG del perfil durante un refinamiento (se combina al cerrar la fase)
+
+def profile_config():
+    """Parámetros DSP de los que depende la escala del RMS: el baseline EEG sólo se reutiliza si coinciden"""
+    return {'srate': SRATE, 'win': WIN, 'step': STEP, 'band_engine': band_engine_mode,
+            'eeg_mode': eeg_processing_mode, 'bands': {b: list(e) for b, e in BAND_EDGES.items()}}
+
+def merge_profile_prior(st, saved):
+    """Refinamiento: lo medido y el perfil pesan lo mismo (el perfil cuenta como st.count muestras)"""
+    if saved and st.count:
+        st.merge(RunningStats.from_summary(st.count, saved['mu'], saved['sigma'], saved['min'], saved['max']))
+
+def save_baseline_profile():
+    """Guarda el baseline recién calibrado en perfiles-baseline/<participante>.json (escritura atómica)"""
+    if not participant or is_simulation or is_batch: return
+    def num(v): return None if v is None else float(v)
+    profile = {'participant': participant, 'saved': datetime.now().isoformat(timespec='seconds'),
+               'config': profile_config(), 'eeg': {}}
+    if use_eeg:
+        if eeg_processing_mode == 'individual':
+            profile['eeg']['channels'] = {ch: {b: {k: num(v) for k, v in st.items()} for b, st in vals.items()}
+                                          for ch, vals in baseline_eeg_values_per_channel.items() if vals}
+        else:
+            profile['eeg']['average'] = {b: {k: num(v) for k, v in st.items()} for b, st in baseline_eeg_values.items()}
+    if use_acc:
+        profile['acc'] = {a: {k: num(v) for k, v in rng.items()} for a, rng in (('x', baseline_acc_x), ('y', baseline_acc_y), ('z', baseline_acc_z))}
+    profile['bio'] = {k: {f: num(b[f]) for f in ('mu', 'amp', 'min', 'max')} for k, b in bio.items() if globals().get(f'use_{k}') and b['mu'] is not None}
+    if use_dist and dist['min'] is not None:
+        profile['dist'] = {'min': num(dist['min']), 'max': num(dist['max'])}
+    path = profile_path(participant)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump(profile, f, ensure_ascii=False, indent=1)
+        os.replace(path + '.tmp', path)
+        print(f"💾 Perfil de baseline guardado: {PROFILE_DIR_NAME}/{os.path.basename(path)}")
+    except OSError as e:
+        print(f"⚠️ No se pudo guardar el perfil de {participant}: {e}")
+
+def apply_baseline_profile(profile, refine_sec=0):
+    """Carga un perfil en lugar de calibrar. El EEG sólo se usa si la config DSP coincide; con
+    refine_sec > 0 se hace un baseline EEG corto que se combina con el del perfil."""
+    global baseline_eeg_done, baseline_acc_neutral_done, baseline_acc_movement_done, baseline_acc_done
+    global bio_done, dist_done, baseline_done, frames_left, eeg_phase_sec, baseline_prior
+    global baseline_acc_x, baseline_acc_y, baseline_acc_z
+    print(f"\n📂 Aplicando perfil de baseline de {profile.get('participant', participant)}...")
+    eeg = profile.get('eeg', {})
+    saved_cfg = profile.get('config', {})
+    if use_eeg:
+        mismatch = [k for k, v in profile_config().items() if saved_cfg.get(k) != v]
+        key = 'channels' if eeg_processing_mode == 'individual' else 'average'
+        if mismatch or not eeg.get(key):
+            print(f"  ⚠️ EEG: el perfil no sirve con esta configuración ({', '.join(mismatch) or 'sin datos ' + key}) → se calibra ({BASE_SEC}s)")
+        else:
+            if key == 'channels':
+                for ch, vals in eeg['channels'].items():
+                    for b, st in vals.items():
+                        bands_per_channel[ch][b]['mu'], bands_per_channel[ch][b]['sd'] = st['mu'], st['sigma']
+                        baseline_eeg_values_per_channel[ch][b] = dict(st)
+            else:
+                for b, st in eeg['average'].items():
+                    bands[b]['mu'], bands[b]['sd'] = st['mu'], st['sigma']
+                    baseline_eeg_values[b] = dict(st)
+            if refine_sec > 0:
+                baseline_prior = eeg
+                eeg_phase_sec = refine_sec
+                frames_left = int(refine_sec / (STEP / SRATE))
+                print(f"  ✓ EEG: perfil + refinamiento de {refine_sec}s")
+            else:
+                baseline_eeg_done = True
+                print("  ✓ EEG: baseline del perfil")
+                if key == 'average':
+                    send_proc("/py/baseline_mu", [float(bands[b]['mu']) for b in FILTS], force=True)
+                    send_proc("/py/baseline_sigma", [float(bands[b]['sd']) for b in FILTS], force=True)
+                else:
+                    send_channel_baseline()
+    acc_saved = profile.get('acc')
+    if use_acc and acc_saved:
+        baseline_acc_x, baseline_acc_y, baseline_acc_z = (dict(acc_saved[a]) for a in ('x', 'y', 'z'))
+        for a, st in acc_saved.items():
+            acc_baseline[a] = st['neutral']
+            acc_rng[a]['min'], acc_rng[a]['max'] = st['min'], st['max']
+        baseline_acc_neutral_done = baseline_acc_movement_done = baseline_acc_done = True
+        print(f"  ✓ ACC: neutral=({acc_baseline['x']:+.3f}, {acc_baseline['y']:+.3f}, {acc_baseline['z']:+.3f})")
+        send_acc_baseline()
+    elif use_acc:
+        print("  ⚠️ ACC: el perfil no tiene baseline ACC → se calibra")
+    for k, st in profile.get('bio', {}).items():
+        if globals().get(f'use_{k}'):
+            bio[k].update(st); bio[k]['env'] = 0
+    if all(k in profile.get('bio', {}) for k in bio if globals().get(f'use_{k}')):
+        bio_done = True
+    if use_dist and profile.get('dist'):
+        dist.update(profile['dist']); dist_done = True
+    baseline_done = baseline_eeg_done and baseline_acc_done and bio_done and dist_done
 # ---------------------
 
 # --- Bucle de Simulación ---
@@ -1662,28 +3065,29 @@ def simulation_loop():
                 MU_DEFAULTS.get('gamma', 0.5) + 0.1*math.sin(1.55*t_sim+6.0)
             ]
             
-            # 5. Enviar OSC
-            send_proc("/py/bands_signed_env", osc_signed, force=True)
-            send_proc("/py/bands_env", osc_env, force=True)
-            send_proc("/py/bands_raw", osc_raw, force=True)
-            send_proc("/py/acc", osc_acc, force=True)
+            # 5. Enviar OSC (un bundle por frame)
+            with osc_bundle_tick():
+                send_proc("/py/bands_signed_env", osc_signed, force=True)
+                send_proc("/py/bands_env", osc_env, force=True)
+                send_proc("/py/bands_raw", osc_raw, force=True)
+                send_proc("/py/acc", osc_acc, force=True)
             
-            # Si modo multicanal, enviar también por canal
-            if eeg_processing_mode == 'individual':
-                for idx, ch_name in enumerate(EEG_CHANNELS):
-                    ch_lower = ch_name.lower()
-                    phase_offset = idx * 0.5
-                    ch_env = [
-                        0.1+((math.sin(0.22*t_sim+phase_offset)+1.0)/2.0)*(Z_MAX-0.2),
-                        0.1+((math.sin(0.42*t_sim+1.7+phase_offset)+1.0)/2.0)*(Z_MAX-0.4),
-                        0.1+((math.sin(0.62*t_sim+3.2+phase_offset)+1.0)/2.0)*(Z_MAX-0.5),
-                        0.1+((math.sin(1.02*t_sim+4.7+phase_offset)+1.0)/2.0)*(Z_MAX-1.0),
-                        0.1+((math.sin(1.52*t_sim+6.2+phase_offset)+1.0)/2.0)*(Z_MAX-1.5)
-                    ]
-                    ch_signed = [x * (1.0 if idx < 2 else -1.0) for x in ch_env]
-                    send_proc(f"/py/{ch_lower}/bands_env", ch_env, force=True)
-                    send_proc(f"/py/{ch_lower}/bands_signed_env", ch_signed, force=True)
-                    send_proc(f"/py/{ch_lower}/bands_raw", [round(x*1.5, 3) for x in ch_env], force=True)
+                # Si modo multicanal, enviar también por canal
+                if eeg_processing_mode == 'individual':
+                    for idx, ch_name in enumerate(EEG_CHANNELS):
+                        ch_lower = ch_name.lower()
+                        phase_offset = idx * 0.5
+                        ch_env = [
+                            0.1+((math.sin(0.22*t_sim+phase_offset)+1.0)/2.0)*(Z_MAX-0.2),
+                            0.1+((math.sin(0.42*t_sim+1.7+phase_offset)+1.0)/2.0)*(Z_MAX-0.4),
+                            0.1+((math.sin(0.62*t_sim+3.2+phase_offset)+1.0)/2.0)*(Z_MAX-0.5),
+                            0.1+((math.sin(1.02*t_sim+4.7+phase_offset)+1.0)/2.0)*(Z_MAX-1.0),
+                            0.1+((math.sin(1.52*t_sim+6.2+phase_offset)+1.0)/2.0)*(Z_MAX-1.5)
+                        ]
+                        ch_signed = [x * (1.0 if idx < 2 else -1.0) for x in ch_env]
+                        send_proc(f"/py/{ch_lower}/bands_env", ch_env, force=True)
+                        send_proc(f"/py/{ch_lower}/bands_signed_env", ch_signed, force=True)
+                        send_proc(f"/py/{ch_lower}/bands_raw", [round(x*1.5, 3) for x in ch_env], force=True)
             # 6. Imprimir estado
             refresh(line_post())
             # 7. Incrementar tiempo y esperar
@@ -1700,6 +3104,214 @@ def catch_all_osc(unused_addr, *args):
     if debug_mode:
         print(f"[OSC RECEIVED] {unused_addr}: {args}")
 
+class FastOSCDecoder:
+    """Decodificador OSC de ruta rápida para las direcciones Muse conocidas (sin Dispatcher).
+    Decodifica los float32 del payload con numpy.frombuffer directamente del buffer
+    recibido. Todo lo demás (direcciones desconocidas, tipos no float) se entrega al
+    Dispatcher de python-osc."""
+    def __init__(self, dispatcher, fast_handlers):
+        self.dispatcher = dispatcher
+        self.fast_handlers = {addr.encode(): h for addr, h in fast_handlers.items()}
+        self.packets = self.fast_count = self.fallback_count = self.errors = 0
+
+    def handle_datagram(self, buf, size, client):
+        self.packets += 1
+        try:
+            self._handle_packet(buf, 0, size, client)
+        except Exception as e:
+            self.errors += 1
+            if debug_mode:
+                print(f"[OSC FAST] Error decodificando paquete: {e}")
+
+    def _handle_packet(self, buf, start, end, client):
+        if buf.startswith(b'#bundle\0', start, end):
+            i = start + 16  # '#bundle\0' + timetag de 8 bytes
+            while i + 4 <= end:
+                size = int.from_bytes(buf[i:i + 4], 'big')
+                if i + 4 + size > end:
+                    # Elemento truncado: el buffer sigue con bytes de datagramas anteriores
+                    self.errors += 1
+                    return
+                self._handle_packet(buf, i + 4, i + 4 + size, client)
+                i += 4 + size
+            return
+        addr_end = buf.find(0, start, end)
+        handler = self.fast_handlers.get(bytes(buf[start:addr_end]))
+        if handler is not None:
+            tags_start = (addr_end + 4) & ~3
+            if tags_start < end and buf[tags_start] == 0x2C:  # ','
+                tags_end = buf.find(0, tags_start, end)
+                n_vals = tags_end - tags_start - 1
+                payload = (tags_end + 4) & ~3
+                if (n_vals > 0 and payload + 4 * n_vals <= end
+                        and buf.count(b'f', tags_start + 1, tags_end) == n_vals):
+                    handler(np.frombuffer(buf, dtype='>f4', count=n_vals, offset=payload).astype(float))
+                    self.fast_count += 1
+                    return
+        self.fallback_count += 1
+        self.dispatcher.call_handlers_for_packet(bytes(buf[start:end]), client)
+
+    def stats_line(self):
+        return f"paquetes={self.packets} rápidos={self.fast_count} dispatcher={self.fallback_count} errores={self.errors}"
+
+
+class FastOSCReceiver(FastOSCDecoder):
+    """Receptor UDP directo: recv_into sobre un buffer preasignado + FastOSCDecoder.
+    Interfaz compatible con BlockingOSCUDPServer en lo que usa el bucle principal
+    (handle_request/timeout/shutdown/server_close)."""
+    MAX_DRAIN = 512  # datagramas máximos por handle_request()
+
+    def __init__(self, server_address, dispatcher, fast_handlers, rcvbuf=4 * 1024 * 1024):
+        super().__init__(dispatcher, fast_handlers)
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        try:
+            self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, rcvbuf)
+        except OSError:
+            pass
+        self.sock.bind(server_address)
+        self.sock.setblocking(False)
+        self.buf = bytearray(65536)
+        self.timeout = 0.05
+
+    def handle_request(self):
+        """Espera hasta `timeout` y procesa todos los datagramas pendientes"""
+        ready, _, _ = select.select([self.sock], [], [], self.timeout)
+        if not ready:
+            return 0
+        n = 0
+        while n < self.MAX_DRAIN:
+            try:
+                size, client = self.sock.recvfrom_into(self.buf)
+            except (BlockingIOError, InterruptedError):
+                break
+            n += 1
+            self.handle_datagram(self.buf, size, client)
+        return n
+
+    def shutdown(self):
+        pass
+
+    def server_close(self):
+        self.sock.close()
+        print(f"  [OSC FAST] {self.stats_line()}")
+
+class AsyncOSCPipeline:
+    """Modo asyncio del bucle en vivo: recepción UDP, procesamiento, grabación y envío
+    OSC como tareas separadas conectadas por colas acotadas. La escritura a disco corre
+    en un executor, así un flush lento no detiene la lectura UDP ni los envíos."""
+    QUEUE_MAX = 8192
+
+    class _Protocol(asyncio.DatagramProtocol):
+        def __init__(self, pipeline):
+            self.pipeline = pipeline
+
+        def datagram_received(self, data, addr):
+            try:
+                self.pipeline.rx_queue.put_nowait((data, addr))
+            except asyncio.QueueFull:
+                self.pipeline.rx_dropped += 1
+
+    def __init__(self, server_address, decoder, data_recorder=None):
+        self.server_address = server_address
+        self.decoder = decoder
+        self.data_recorder = data_recorder
+        self.loop = None
+        self.loop_thread_id = None
+        self.rx_queue = None
+        self.tx_queue = None
+        self.rx_dropped = self.tx_dropped = self.sent = 0
+        self.running = False
+
+    def put_outbound(self, path, data):
+        """Encola un mensaje de salida (seguro desde cualquier hilo)"""
+        if threading.get_ident() == self.loop_thread_id:
+            self._enqueue_tx((path, data))
+        else:
+            self.loop.call_soon_threadsafe(self._enqueue_tx, (path, data))
+
+    def _enqueue_tx(self, item):
+        try:
+            self.tx_queue.put_nowait(item)
+        except asyncio.QueueFull:
+            self.tx_dropped += 1
+
+    async def _process(self):
+        while self.running:
+            try:
+                batch = [await asyncio.wait_for(self.rx_queue.get(), EEG_BLOCK_MAX_AGE)]
+            except asyncio.TimeoutError:
+                flush_stale_eeg()  # sin datagramas: no dejar un bloque EEG incompleto esperando
+                continue
+            while not self.rx_queue.empty():
+                batch.append(self.rx_queue.get_nowait())
+            for data, addr in batch:
+                self.decoder.handle_datagram(data, len(data), addr)
+            flush_stale_eeg()
+            await asyncio.sleep(0)  # ceder al envío/grabación
+
+    async def _send(self):
+        while self.running:
+            path, data = await self.tx_queue.get()
+            try:
+                if proc_client is not None:
+                    if path is None:
+                        proc_client.send(data)  # bundle ya construido
+                    else:
+                        proc_client.send_message(path, data)
+                    self.sent += 1
+            except Exception:
+                pass
+
+    async def _record(self, baseline_time):
+        metadata_written = False
+        while self.running:
+            await asyncio.sleep(0.1)
+            if not baseline_done:
+                continue
+            # DataRecorder sólo encola (su hilo escritor toca el disco): se puede llamar directo
+            if not metadata_written:
+                self.data_recorder.write_baseline_metadata()
+                metadata_written = True
+            self.data_recorder.write_data(time.time() - baseline_time)
+
+    async def _main(self, baseline_time):
+        global async_pipeline
+        self.loop = asyncio.get_running_loop()
+        self.loop_thread_id = threading.get_ident()
+        self.rx_queue = asyncio.Queue(self.QUEUE_MAX)
+        self.tx_queue = asyncio.Queue(self.QUEUE_MAX)
+        transport, _ = await self.loop.create_datagram_endpoint(lambda: self._Protocol(self), local_addr=self.server_address)
+        try:
+            transport.get_extra_info('socket').setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4 * 1024 * 1024)
+        except (OSError, AttributeError):
+            pass
+        self.running = True
+        async_pipeline = self
+        tasks = [asyncio.create_task(self._process()), asyncio.create_task(self._send())]
+        if self.data_recorder is not None:
+            tasks.append(asyncio.create_task(self._record(baseline_time)))
+        print(f"[OSC] ✓ Servidor asyncio escuchando en {self.server_address[0]}:{self.server_address[1]}")
+        try:
+            while main_loop_running and threads_active:
+                await asyncio.sleep(0.1)
+        finally:
+            async_pipeline = None
+            self.running = False
+            for t in tasks:
+                t.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            transport.close()
+
+    def run(self, baseline_time):
+        try:
+            asyncio.run(self._main(baseline_time))
+        finally:
+            print(f"  [OSC ASYNC] {self.decoder.stats_line()} enviados={self.sent}"
+                  f" descartados_rx={self.rx_dropped} descartados_tx={self.tx_dropped}")
+
+USE_FAST_OSC = True  # Receptor directo para /desdemuse/* (False = BlockingOSCUDPServer)
+
 disp = Dispatcher()
 
 # Mapear catch-all primero
@@ -1724,8 +3336,20 @@ if not is_simulation:
 else:
     print(f"[OSC] Modo simulación - no se esperan datos reales")
 
-if needs_baseline_calibration:
-    print(f"► Iniciando baseline ({BASE_SEC}s).")
+# Handlers de la ruta rápida: reciben directamente el arreglo de floats decodificado
+fast_osc_handlers = {}
+if not is_simulation:
+    if use_eeg: fast_osc_handlers["/desdemuse/eeg"] = muse_eeg_array
+    if use_acc: fast_osc_handlers["/desdemuse/acc"] = lambda v: muse_acc(None, *v.tolist()) if len(v) == 3 else None
+    if use_ppg: fast_osc_handlers["/desdemuse/ppg"] = lambda v: muse_ppg(None, *v.tolist())
+    if use_gyro: fast_osc_handlers["/desdemuse/gyro"] = lambda v: muse_gyro(None, *v.tolist()) if len(v) == 3 else None
+
+if baseline_profile is not None:
+    apply_baseline_profile(baseline_profile, profile_refine_sec)
+if baseline_done and baseline_profile is not None:
+    print("► Baseline cargado del perfil: procesamiento inmediato.")
+elif needs_baseline_calibration:
+    print(f"► Iniciando baseline ({eeg_phase_sec}s).")
 elif not is_simulation:
     print("► No se requiere baseline.")
 
@@ -1738,7 +3362,7 @@ if not is_simulation:
 # --- Lanzar Loops ---
 threads_active = True
 midi_thread = None; serial_thread = None
-if any(sig in MIDI_OUT and not MIDI_OUT[sig].name.startswith("fake_") for sig in TARGET_CC): midi_thread = threading.Thread(target=midi_tick, daemon=True); midi_thread.start()
+if not is_batch and any(sig in MIDI_OUT and not MIDI_OUT[sig].name.startswith("fake_") for sig in TARGET_CC): midi_thread = threading.Thread(target=midi_tick, daemon=True); midi_thread.start()
 else: print("⚠️ No MIDI activo.")
 if not is_simulation and any((use_myo, use_plant1, use_plant2, use_temp_hum, use_dist)): serial_thread = threading.Thread(target=serial_loop, daemon=True); serial_thread.start()
 elif not is_simulation: print("⚠️ No Arduino activo.")
@@ -1747,7 +3371,10 @@ elif not is_simulation: print("⚠️ No Arduino activo.")
 listener_thread = threading.Thread(target=listen_shortcuts, daemon=True)
 listener_thread.start()
 
-muse_selected = not is_simulation and (use_eeg or use_acc)
+muse_selected = not is_simulation and not is_batch and (use_eeg or use_acc)
+if muse_selected and OUTPUT_RATE_HZ > 0:
+    output_scheduler = OutputScheduler(OUTPUT_RATE_HZ)
+    output_scheduler.start()
 arduino_selected = not is_simulation and any((use_myo, use_plant1, use_plant2, use_temp_hum, use_dist))
 
 print("\n--- Estado de Ejecución ---")
@@ -1758,11 +3385,11 @@ server = None
 main_loop_running = True
 try:
     # Instrucciones de baseline si se va a usar EEG
-    if use_eeg and not is_simulation:
+    if use_eeg and not is_simulation and not is_batch and not baseline_eeg_done:
         print("\n" + "="*60)
         print("⚙️  CALIBRACIÓN INICIAL DE ESTADO MENTAL")
         print("="*60)
-        print(f"Duración: {BASE_SEC} segundos")
+        print(f"Duración: {eeg_phase_sec} segundos")
         print("\n📋 INSTRUCCIONES:")
         print("1. Asegúrate de que Muse está conectado y transmitiendo")
         print("2. Siéntate cómodamente en tu estado NEUTRAL/BASE")
@@ -1772,19 +3399,29 @@ try:
         print("y permitirá el sistema ajustarse a TI.")
         print("="*60 + "\n")
     
-    input("Presiona Enter para iniciar bucle principal...")
+    if not is_batch:
+        input("Presiona Enter para iniciar bucle principal...")
 
     if is_simulation:
         print("Entrando a simulation_loop...")
         simulation_loop()
+    elif is_batch:
+        batch_reprocess()
     elif muse_selected:
         print("Iniciando servidor OSC...")
         print(f"[OSC] Escuchando en 0.0.0.0:{OSC_PORT}")
         print(f"[OSC] IMPORTANTE: Configura la app Muse para enviar a {MY_LOCAL_IP}:{OSC_PORT}")
         try:
-            server = BlockingOSCUDPServer(("0.0.0.0", OSC_PORT), disp)
-            print(f"[OSC] ✓ Servidor OSC iniciado correctamente")
-            print(f"[OSC] Esperando datos de Muse...")
+            if use_asyncio_server:
+                pass  # El socket lo abre AsyncOSCPipeline dentro de su event loop
+            elif USE_FAST_OSC:
+                server = FastOSCReceiver(("0.0.0.0", OSC_PORT), disp, fast_osc_handlers)
+                print(f"[OSC] ✓ Ruta rápida activa para: {', '.join(fast_osc_handlers) or '-'}")
+            else:
+                server = BlockingOSCUDPServer(("0.0.0.0", OSC_PORT), disp)
+            if server is not None:
+                print(f"[OSC] ✓ Servidor OSC iniciado correctamente")
+                print(f"[OSC] Esperando datos de Muse...")
         except OSError as e:
             print(f"[OSC] ✗ Error al abrir puerto {OSC_PORT}: {e}")
             main_loop_running = False
@@ -1796,22 +3433,35 @@ try:
         
         safe_print("Entrando a bucle OSC...")
         if use_eeg and not baseline_eeg_done:
-            safe_print(f"\n🔄 INICIANDO CALIBRACIÓN ({BASE_SEC}s)...")
+            safe_print(f"\n🔄 INICIANDO CALIBRACIÓN ({eeg_phase_sec}s)...")
             safe_print("   Mantén una postura relajada y neutral\n")
         
         # Inicializar grabador de datos si está habilitado
         data_recorder = None
         baseline_metadata_written = False  # Guard para escribir metadatos solo una vez
         if save_data:
-            data_recorder = DataRecorder()
+            data_recorder = BinaryDataRecorder() if record_format == 'bses' else DataRecorder()
             data_recorder.start()
+            if save_raw:
+                raw_recorder = RawSampleRecorder(prefix=data_recorder.filename.rsplit('.', 1)[0],
+                                                 streams=[n for n, on in (('eeg', use_eeg), ('acc', use_acc), ('ppg', use_ppg)) if on])
+                raw_recorder.start()
         
-        server.timeout = 0.05  # Timeout muy corto para responder rápido a Ctrl+C
         baseline_time = time.time()  # Marca el tiempo de inicio del baseline
         
+        if use_asyncio_server:
+            try:
+                AsyncOSCPipeline(("0.0.0.0", OSC_PORT), FastOSCDecoder(disp, fast_osc_handlers), data_recorder).run(baseline_time)
+            except KeyboardInterrupt:
+                safe_print("\n\n✋ Ctrl+C detectado. Cerrando...")
+            main_loop_running = False
+        else:
+            server.timeout = 0.05  # Timeout muy corto para responder rápido a Ctrl+C
+        
         while main_loop_running:
             try:
                 server.handle_request()
+                flush_stale_eeg()  # timeout de handle_request: bloque EEG incompleto y viejo
                 
                 # Escribir metadatos del baseline apenas se completa (una sola vez)
                 if data_recorder and baseline_done and not baseline_metadata_written:
@@ -1859,6 +3509,20 @@ finally:
     main_loop_running = False
     safe_print("\nIniciando cierre...")
     
+    # Procesar (y grabar) las últimas muestras EEG de un bloque incompleto
+    try:
+        flush_eeg_block()
+    except Exception:
+        pass
+    
+    if output_scheduler is not None:
+        output_scheduler.stop()
+        safe_print(output_scheduler.stats_line())
+    
+    # Cerrar grabación cruda (espera a que los writers vacíen su cola)
+    if raw_recorder is not None:
+        raw_recorder.close()
+    
     # Cerrar grabador de datos si está activo
     if 'data_recorder' in locals() and data_recorder is not None:
         data_recorder.close()
@@ -0,0 +1,33 @@
+"""Carga definiciones sueltas de los scripts py-v*.py para los tests.
+
+Los scripts arrancan el menú (input()) al importarse, así que no se importan: se toman del AST
+sólo las clases, funciones y constantes pedidas y se ejecutan en un namespace propio."""
+import ast, bisect, json, math, os
+
+import numpy as np
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def load_defs(script, names, **env):
+    """Namespace con las definiciones `names` de `script` (en el orden del archivo).
+    `env` agrega los globales que esas definiciones usan al ejecutarse (p. ej. debug_mode)."""
+    path = os.path.join(SCRIPTS_DIR, script)
+    with open(path, encoding='utf-8') as f:
+        tree = ast.parse(f.read(), path)
+    ns = dict(np=np, math=math, bisect=bisect, json=json, os=os)
+    ns.update(env)
+    wanted = set(names)
+    for node in tree.body:
+        if isinstance(node, (ast.ClassDef, ast.FunctionDef)):
+            name = node.name
+        elif isinstance(node, ast.Assign) and len(node.targets) == 1 and isinstance(node.targets[0], ast.Name):
+            name = node.targets[0].id
+        else:
+            continue
+        if name in wanted:
+            exec(compile(ast.Module([node], []), path, 'exec'), ns)
+    missing = wanted - ns.keys()
+    if missing:
+        raise LookupError(f"{script} no define {sorted(missing)}")
+    return ns
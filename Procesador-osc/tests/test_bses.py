@@ -0,0 +1,79 @@
+import numpy as np
+import pytest
+
+from script_defs import load_defs
+
+ns = load_defs('py-v26-multichannel.py', ['BSES_MAGIC', 'BSES_HEADER_SIZE', 'BSES_F8_FIELDS',
+                                          'bses_dtype', 'write_bses_header', 'load_bses'])
+bses_dtype, write_bses_header, load_bses = ns['bses_dtype'], ns['write_bses_header'], ns['load_bses']
+FIELDS = ['timestamp', 'time_sec', 'delta_env', 'alpha_env', 'acc_x']
+
+
+def write_session(path, fields, rows, header_extra=None, blocks=(3,)):
+    """Igual que BinaryDataRecorder: header reservado, bloques de registros y header final con rows"""
+    header = {'format': 'bses', 'version': 1, 'kind': 'summary', 'fields': fields, 'baseline': None, 'rows': 0}
+    header.update(header_extra or {})
+    dtype = bses_dtype(fields, header.get('f8_fields', ns['BSES_F8_FIELDS']))
+    data = np.zeros(len(rows), dtype)
+    for i, r in enumerate(rows):
+        data[i] = tuple(r)
+    with open(path, 'w+b') as f:
+        write_bses_header(f, header)
+        for chunk in np.array_split(data, blocks[0]):
+            f.write(chunk.tobytes())
+            header['baseline'] = {'eeg': {'alpha': {'mu': 1.5}}}  # como _write_metadata a mitad de sesión
+            write_bses_header(f, header)
+        header['rows'] = len(rows)
+        write_bses_header(f, header)
+    return data
+
+
+@pytest.fixture
+def rows():
+    rng = np.random.default_rng(1)
+    t = 1.7e9 + np.arange(10) * 0.1
+    return [(t[i], i * 0.1, *rng.normal(size=2), np.nan if i == 4 else rng.normal()) for i in range(10)]
+
+
+@pytest.mark.parametrize('mmap', [True, False])
+def test_round_trip(tmp_path, rows, mmap):
+    path = str(tmp_path / 'meditacion_x.bses')
+    data = write_session(path, FIELDS, rows)
+    header, loaded = load_bses(path, mmap=mmap)
+    assert header['rows'] == 10
+    assert header['baseline'] == {'eeg': {'alpha': {'mu': 1.5}}}
+    assert loaded.dtype == data.dtype
+    assert loaded.dtype['timestamp'] == np.float64 and loaded.dtype['delta_env'] == np.float32
+    # timestamp/time_sec exactos (float64); el resto redondeado a float32, NaN = sin dato
+    np.testing.assert_array_equal(loaded['timestamp'], [r[0] for r in rows])
+    np.testing.assert_array_equal(loaded['acc_x'], data['acc_x'])
+    np.testing.assert_allclose(loaded['delta_env'], [r[2] for r in rows], rtol=1e-6)
+    assert np.isnan(loaded['acc_x'][4])
+
+
+def test_header_f8_fields_and_cut_session(tmp_path):
+    path = str(tmp_path / 'meditacion_x_raw_eeg.bses')
+    fields = ['timestamp', 'tp9', 'af7']
+    write_session(path, fields, [(i / 256, i, -i) for i in range(7)], {'kind': 'raw', 'f8_fields': ['timestamp']})
+    with open(path, 'ab') as f:
+        f.write(b'\0' * 5)  # registro a medio escribir (sesión cortada)
+    header, loaded = load_bses(path)
+    assert len(loaded) == 7
+    assert loaded.dtype['tp9'] == np.float32
+    np.testing.assert_array_equal(loaded['af7'], -np.arange(7))
+
+
+def test_empty_and_invalid_files(tmp_path):
+    empty = str(tmp_path / 'vacia.bses')
+    write_session(empty, FIELDS, [], blocks=(1,))
+    header, loaded = load_bses(empty)
+    assert len(loaded) == 0 and loaded.dtype.names == tuple(FIELDS)
+    bad = tmp_path / 'otra.bses'
+    bad.write_bytes(b'timestamp,time_sec\n')
+    with pytest.raises(ValueError):
+        load_bses(str(bad))
+
+
+def test_header_too_large(tmp_path):
+    with open(tmp_path / 'grande.bses', 'w+b') as f, pytest.raises(ValueError):
+        write_bses_header(f, {'fields': ['x' * 70000]})
@@ -0,0 +1,91 @@
+import pytest
+
+pytest.importorskip('pythonosc')
+from pythonosc.osc_bundle_builder import IMMEDIATELY, OscBundleBuilder
+from pythonosc.osc_message_builder import OscMessageBuilder
+
+from script_defs import load_defs
+
+FastOSCDecoder = load_defs('py-v26-multichannel.py', ['FastOSCDecoder'], debug_mode=False)['FastOSCDecoder']
+
+
+class RecordingDispatcher:
+    def __init__(self):
+        self.packets = []
+
+    def call_handlers_for_packet(self, data, client):
+        self.packets.append(bytes(data))
+
+
+def message(addr, *args):
+    m = OscMessageBuilder(addr)
+    for a in args:
+        m.add_arg(a, 'f' if isinstance(a, float) else None)
+    return m.build()
+
+
+def bundle(*contents):
+    b = OscBundleBuilder(IMMEDIATELY)
+    for c in contents:
+        b.add_content(c)
+    return b.build()
+
+
+@pytest.fixture
+def decoder():
+    got = []
+    disp = RecordingDispatcher()
+    dec = FastOSCDecoder(disp, {'/desdemuse/eeg': lambda v: got.append(v.tolist())})
+    return dec, got, disp
+
+
+def feed(dec, dgram, size=None, pad=64):
+    """Como FastOSCReceiver: el datagrama llega a un buffer preasignado más grande"""
+    buf = bytearray(len(dgram) + pad)
+    buf[:len(dgram)] = dgram
+    dec.handle_datagram(buf, len(dgram) if size is None else size, None)
+
+
+def test_float_message_takes_fast_path(decoder):
+    dec, got, disp = decoder
+    feed(dec, message('/desdemuse/eeg', 1.5, -2.0, 800.25, 0.0).dgram)
+    assert got == [[1.5, -2.0, 800.25, 0.0]]
+    assert (dec.fast_count, dec.fallback_count, dec.errors) == (1, 0, 0)
+    assert disp.packets == []
+
+
+def test_unknown_address_and_non_float_go_to_dispatcher(decoder):
+    dec, got, disp = decoder
+    other = message('/desdemuse/acc', 0.1, 0.2, 0.9).dgram
+    ints = message('/desdemuse/eeg', 1, 2).dgram
+    feed(dec, other)
+    feed(dec, ints)
+    assert got == []
+    assert disp.packets == [other, ints]
+    assert dec.fallback_count == 2
+
+
+def test_bundle_elements_are_decoded_in_order(decoder):
+    dec, got, disp = decoder
+    acc = message('/desdemuse/acc', 0.0, 0.2, 0.9)
+    inner = bundle(message('/desdemuse/eeg', 3.0, 4.0))
+    feed(dec, bundle(message('/desdemuse/eeg', 1.0, 2.0), acc, inner).dgram)
+    assert got == [[1.0, 2.0], [3.0, 4.0]]
+    assert disp.packets == [acc.dgram]
+    assert dec.errors == 0
+
+
+def test_truncated_bundle_element_is_not_decoded(decoder):
+    dec, got, disp = decoder
+    dgram = bundle(message('/desdemuse/eeg', 1.0, 2.0), message('/desdemuse/eeg', 3.0, 4.0)).dgram
+    feed(dec, dgram, size=len(dgram) - 4)
+    assert got == [[1.0, 2.0]]
+    assert dec.errors == 1
+
+
+def test_truncated_float_payload_is_not_decoded(decoder):
+    dec, got, disp = decoder
+    dgram = message('/desdemuse/eeg', 1.0, 2.0, 3.0).dgram
+    feed(dec, dgram, size=len(dgram) - 4)
+    assert got == []
+    assert dec.fast_count == 0
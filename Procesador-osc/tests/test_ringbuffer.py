@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+
+from script_defs import load_defs
+
+RingBuffer = load_defs('py-v26-multichannel.py', ['RingBuffer'])['RingBuffer']
+
+
+def test_window_follows_wraparound():
+    rb = RingBuffer(8)
+    seen = np.arange(23, dtype=float)
+    for chunk in np.split(seen, [5, 11, 12, 20]):
+        rb.append(chunk)
+    assert rb.count == 8
+    np.testing.assert_array_equal(rb.window()[0], seen[-8:])
+    np.testing.assert_array_equal(rb.latest(3)[0], seen[-3:])
+
+
+def test_block_longer_than_capacity_keeps_tail():
+    rb = RingBuffer(4)
+    rb.append(np.arange(3.0))
+    rb.append(np.arange(10.0, 20.0))
+    np.testing.assert_array_equal(rb.window()[0], [16, 17, 18, 19])
+    assert rb.pending == 13
+
+
+def test_views_share_memory_and_are_contiguous():
+    rb = RingBuffer(6, n_channels=2)
+    rb.append(np.arange(20.0).reshape(2, 10))
+    w = rb.window()
+    assert np.shares_memory(w, rb._data)
+    assert w.shape == (2, 6)
+    assert w.strides[1] == w.itemsize
+    np.testing.assert_array_equal(w, [[4, 5, 6, 7, 8, 9], [14, 15, 16, 17, 18, 19]])
+
+
+def test_append_sample_matches_append():
+    a, b = RingBuffer(5, n_channels=4), RingBuffer(5, n_channels=4)
+    x = np.random.default_rng(0).normal(size=(4, 13))
+    a.append(x)
+    for col in x.T:
+        b.append_sample(col)
+    np.testing.assert_array_equal(a.window(), b.window())
+    assert a.consume() == b.consume() == 13
+    assert a.pending == 0
+
+
+@pytest.mark.parametrize('n', [0, 1, 3])
+def test_partial_fill_and_clear(n):
+    rb = RingBuffer(4)
+    rb.append(np.arange(float(n)))
+    assert rb.count == n
+    np.testing.assert_array_equal(rb.window()[0], np.arange(float(n)))
+    rb.clear()
+    assert rb.count == rb.pending == 0
+    assert rb.window().shape == (1, 0)
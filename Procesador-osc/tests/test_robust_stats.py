@@ -0,0 +1,83 @@
+import numpy as np
+import pytest
+
+from script_defs import load_defs
+
+ns = load_defs('py-v26-multichannel.py', ['RunningStats', 'P2Quantile', 'RobustStats', 'mix_summaries'])
+RunningStats, P2Quantile, RobustStats = ns['RunningStats'], ns['P2Quantile'], ns['RobustStats']
+EXACT_N = P2Quantile.EXACT_N
+
+
+def robust_of(xs):
+    st = RobustStats()
+    for x in xs:
+        st.add(float(x))
+    return st
+
+
+@pytest.mark.parametrize('n', [1, 2, 10, EXACT_N])
+@pytest.mark.parametrize('p', [0.25, 0.5, 0.75])
+def test_short_baselines_are_exact(n, p):
+    xs = np.random.default_rng(n).normal(size=n)
+    q = P2Quantile(p)
+    for x in xs:
+        q.add(x)
+    assert q.n is None  # sigue en modo exacto
+    assert q.value == pytest.approx(np.percentile(xs, p * 100))
+
+
+def test_markers_are_seeded_from_the_sorted_samples():
+    xs = np.random.default_rng(3).permutation(np.arange(EXACT_N + 1, dtype=float))
+    q = P2Quantile(0.5)
+    for x in xs:
+        q.add(x)
+    assert q.n is not None and len(q.q) == 5
+    assert q.q[0] == 0 and q.q[4] == EXACT_N
+    assert q.value == np.median(xs)
+
+
+@pytest.mark.parametrize('dist', ['normal', 'lognormal'])
+def test_streaming_quartiles_track_numpy(dist):
+    rng = np.random.default_rng(4)
+    xs = rng.normal(size=20000) if dist == 'normal' else rng.lognormal(size=20000)
+    st = robust_of(xs)
+    lo, med, hi = np.percentile(xs, [25, 50, 75])
+    iqr = hi - lo
+    for q, ref in zip(st.quartiles, (lo, med, hi)):
+        assert abs(q.value - ref) < 0.03 * iqr
+    assert st.center == pytest.approx(med, abs=0.03 * iqr)
+    assert st.spread == pytest.approx(iqr / 1.349, rel=0.05)
+    # min/max/media siguen siendo los de RunningStats
+    assert (st.min, st.max) == (xs.min(), xs.max())
+    assert st.mean == pytest.approx(xs.mean())
+
+
+def test_spikes_barely_move_median_and_iqr():
+    rng = np.random.default_rng(5)
+    xs = rng.normal(10, 1, size=2000)
+    xs[rng.choice(len(xs), 60, replace=False)] += 50  # parpadeos
+    st = robust_of(xs)
+    assert np.std(xs) > 5
+    assert st.spread == pytest.approx(1.0, rel=0.15)
+    assert st.center == pytest.approx(10.0, abs=0.15)
+
+
+def test_merge_mixes_center_and_spread():
+    xs = np.random.default_rng(6).normal(2.0, 0.5, size=40)
+    st = robust_of(xs)
+    own = (len(xs), st.center, st.spread)
+    prior = RunningStats.from_summary(40, 4.0, 0.5, 3.0, 5.0)
+    st.merge(prior)
+    n, c, s = ns['mix_summaries'](own, (40, 4.0, 0.5))
+    assert st.count == n == 80
+    assert c == pytest.approx((own[1] + 4.0) / 2)
+    assert st.center == pytest.approx(c)
+    assert st.spread == pytest.approx(s)
+    assert st.max == max(5.0, xs.max())
+
+
+def test_mix_summaries_handles_empty_sides():
+    mix = ns['mix_summaries']
+    a = (10, 1.0, 0.5)
+    assert mix(a, None) == a and mix(None, a) == a and mix((0, 0.0, 0.0), a) == a
+    assert mix(None, None) is None
@@ -0,0 +1,63 @@
+import math
+
+import numpy as np
+import pytest
+
+from script_defs import load_defs
+
+RunningStats = load_defs('py-v26-multichannel.py', ['RunningStats'])['RunningStats']
+
+
+def stats_of(xs):
+    st = RunningStats()
+    for x in xs:
+        st.add(float(x))
+    return st
+
+
+def assert_matches(st, xs):
+    assert st.count == len(xs)
+    assert st.mean == pytest.approx(np.mean(xs), rel=1e-12, abs=1e-12)
+    assert st.std == pytest.approx(np.std(xs), rel=1e-9, abs=1e-12)
+    assert (st.min, st.max) == (np.min(xs), np.max(xs))
+
+
+@pytest.fixture
+def xs():
+    # offset grande: la fórmula ingenua (Σx² - n·μ²) pierde precisión aquí, Welford no
+    return np.random.default_rng(2).normal(1e6, 0.5, size=1000)
+
+
+def test_add_matches_numpy(xs):
+    st = stats_of(xs)
+    assert_matches(st, xs)
+    assert (st.center, st.spread) == (st.mean, st.std)
+
+
+@pytest.mark.parametrize('cut', [0, 1, 500, 999, 1000])
+def test_merge_equals_single_pass(xs, cut):
+    st = stats_of(xs[:cut]).merge(stats_of(xs[cut:]))
+    assert_matches(st, xs)
+
+
+def test_merge_empty_is_noop(xs):
+    st = stats_of(xs[:10])
+    before = (st.count, st.mean, st.m2, st.min, st.max)
+    assert st.merge(RunningStats()) is st
+    assert (st.count, st.mean, st.m2, st.min, st.max) == before
+
+
+def test_from_summary_merges_like_the_samples(xs):
+    saved, new = xs[:600], xs[600:]
+    prior = RunningStats.from_summary(len(saved), saved.mean(), saved.std(), saved.min(), saved.max())
+    assert_matches(stats_of(new).merge(prior), xs)
+
+
+def test_empty_and_reset():
+    st = RunningStats()
+    assert (st.count, st.std) == (0, 0.0)
+    assert (st.min, st.max) == (math.inf, -math.inf)
+    st.add(3.0)
+    assert st.std == 0.0
+    st.reset()
+    assert st.count == 0 and st.mean == 0.0